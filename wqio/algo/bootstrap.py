@@ -1,79 +1,1945 @@
+import os
+import pickle
+import warnings
+import hashlib
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import scipy.stats as stats
 import scipy.stats.distributions as dist
 import scipy.optimize as opt
 
+from . import ros
+
+
+__all__ = ['Stat', 'Fit', 'GroupedStat', 'TwoSampleStat', 'CensoredStat',
+           'Percentile',
+           'ResultCache',
+           'make_boot_index', 'spawn_seeds', 'set_cache', 'get_cache',
+           'cached', 'grouped_BCA', 'logmean', 'logstd', 'geomean']
+
+
+# target size (in bytes) of the blocks of resampled data that are
+# gathered and reduced at once when the full array isn't stored
+_BLOCK_BYTES = 2**20
+
+# target size (in bytes) of the resampled values of a block of groups
+# drawn at once by `GroupedStat`
+_GROUP_BLOCK_BYTES = 2**25
+
+# the on-disk cache of bootstrap results (see `set_cache`)
+_CACHE = None
+
+# version of the bootstrap algorithms and of the format of the cached
+# results. Bump it whenever a change alters the results, so that stale
+# results are no longer looked up.
+_CACHE_VERSION = 1
+
+
+def _block_rows(rowbytes):
+    '''
+    Number of rows of `rowbytes` bytes each that fit in a single block
+    '''
+    return max(1, _BLOCK_BYTES // max(1, rowbytes))
+
+
+def _index_dtype(N):
+    '''
+    Smallest unsigned integer type that can index `N` data points
+    '''
+    if N <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    elif N <= np.iinfo(np.uint32).max + 1:
+        return np.uint32
+    else:
+        return np.intp
+
+
+def _check_random_state(seed):
+    '''
+    Turn `seed` into an object that can draw random integers
+
+    Input:
+        seed (None, int, SeedSequence, RandomState or Generator) : None
+            uses the global numpy random state, an int seeds a new
+            `numpy.random.RandomState` (so the draws are the same as
+            after calling `numpy.random.seed(seed)`), a `SeedSequence`
+            seeds a new `numpy.random.Generator`, and existing
+            RandomState and Generator objects are used as-is.
+
+    Writes:
+        None
+
+    Returns:
+        random_state (module, RandomState or Generator)
+    '''
+    if seed is None or seed is np.random:
+        return np.random
+    elif isinstance(seed, (np.random.RandomState, np.random.Generator)):
+        return seed
+    elif isinstance(seed, np.random.SeedSequence):
+        return np.random.default_rng(seed)
+    elif isinstance(seed, (int, np.integer)):
+        return np.random.RandomState(seed)
+    else:
+        raise ValueError("`seed` must be None, an int, a SeedSequence, "
+                         "a RandomState, or a Generator")
+
+
+def spawn_seeds(seed, n):
+    '''
+    Create `n` independent, reproducible seeds from a single seed.
+    Useful to give each of several bootstrap objects its own random
+    stream.
+
+    Input:
+        seed (None, int, SeedSequence, RandomState or Generator) : root
+            seed. RandomState and Generator objects (and None, i.e.,
+            the global numpy random state) are advanced by a single
+            draw.
+        n (int) : number of seeds to create
+
+    Writes:
+        None
+
+    Returns:
+        seeds (list of numpy.random.SeedSequence)
+    '''
+    if isinstance(seed, np.random.SeedSequence):
+        root = seed
+    elif isinstance(seed, (int, np.integer)):
+        root = np.random.SeedSequence(seed)
+    else:
+        entropy = _randint(_check_random_state(seed), 2**31, None)
+        root = np.random.SeedSequence(entropy)
+
+    return root.spawn(n)
+
+
+def _randint(random_state, N, size):
+    '''
+    Draw integers in [0, `N`) from either a legacy RandomState or a
+    Generator
+    '''
+    if isinstance(random_state, np.random.Generator):
+        return random_state.integers(low=0, high=N, size=size)
+    else:
+        return random_state.randint(low=0, high=N, size=size)
+
+
+def _boot_stats_worker(bsclass, args, kwargs):
+    '''
+    Compute the bootstrapped statistics of a share of the iterations in
+    a worker process or thread.
+    '''
+    return bsclass(*args, **kwargs)._boot_stats
+
+
+def _jackknife(data, statfxn):
+    '''
+    Compute a statistic of each leave-one-out subset of the data
+
+    Input:
+        data (array-like) : the data
+        statfxn (function) : the statistic. Must accept an `axis`
+            keyword unless it's `numpy.mean`, `numpy.std`, or
+            `numpy.var`, which are updated in closed form.
+
+    Writes:
+        None
+
+    Returns:
+        jack_stats (numpy array of floats) : the statistic computed with
+            each data point left out in turn
+    '''
+    data = np.asarray(data, dtype=np.float64)
+    N = data.shape[0]
+
+    # closed-form updates of the mean and variance. the data are
+    # centered first so that the sums of squares stay accurate
+    if statfxn in (np.mean, np.std, np.var):
+        centered = data - data.mean()
+        loo_mean = (centered.sum() - centered) / (N - 1)
+        if statfxn is np.mean:
+            return loo_mean + data.mean()
+
+        loo_var = (np.sum(centered**2) - centered**2) / (N - 1) - loo_mean**2
+        loo_var = np.maximum(loo_var, 0)
+        if statfxn is np.var:
+            return loo_var
+        else:
+            return np.sqrt(loo_var)
+
+    # otherwise, evaluate the statistic on blocks of rows of the
+    # (N, N-1) array of leave-one-out subsets
+    cols = np.arange(N - 1)
+    rows = _block_rows((N - 1) * data.itemsize)
+    jack_stats = []
+    for start in range(0, N, rows):
+        left_out = np.arange(start, min(start + rows, N))
+        index = cols + (cols >= left_out[:, None])
+        jack_stats.append(statfxn(data[index], axis=1))
+
+    return np.concatenate(jack_stats)
+
+
+def _percentile_of_sorted(sorted_data, boot_ranks, q):
+    '''
+    Compute a percentile of each row of resampled data, given the
+    sorted ranks of the resampled values
+
+    Input:
+        sorted_data (numpy array of floats) : the original data, sorted
+        boot_ranks (numpy array of ints) : (NIter, N) array of the
+            ranks (i.e., indices into `sorted_data`) of the resampled
+            values, sorted along each row
+        q (float) : the percentile to compute (0 - 100). Like
+            `numpy.percentile`, linear interpolation is used between
+            order statistics.
+
+    Writes:
+        None
+
+    Returns:
+        stats (numpy array of floats) : the percentile of each row
+    '''
+    N = boot_ranks.shape[1]
+    position = (N - 1) * q / 100.0
+    lower = int(np.floor(position))
+    upper = min(lower + 1, N - 1)
+    frac = position - lower
+
+    a = sorted_data[boot_ranks[:, lower]]
+    b = sorted_data[boot_ranks[:, upper]]
+    if frac == 0:
+        return a
+    elif frac == 0.5:
+        return (a + b) / 2.0
+    else:
+        return a + (b - a) * frac
+
+
+def _percentile_of_columns(sorted_stats, q):
+    '''
+    Compute a different percentile of each column of an array
+
+    Input:
+        sorted_stats (numpy array of floats) : (NIter, k) array, sorted
+            along the first axis
+        q (numpy array of floats) : the percentile (0 - 100) of each of
+            the `k` columns. Linear interpolation is used between order
+            statistics.
+
+    Writes:
+        None
+
+    Returns:
+        stats (numpy array of floats) : the percentile of each column
+    '''
+    NIter, k = sorted_stats.shape
+    position = (NIter - 1) * np.clip(q, 0, 100) / 100.0
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, NIter - 1)
+    frac = position - lower
+
+    columns = np.arange(k)
+    a = sorted_stats[lower, columns]
+    b = sorted_stats[upper, columns]
+    return a + (b - a) * frac
+
+
+def _skew_acceleration(deviations, starts=None):
+    '''
+    Compute the acceleration statistic of the BCA method from the
+    deviations of the data (or of the jackknife estimates) from their
+    mean (Efron and Tibshirani, 1993, eq. 14.15)
+
+    Input:
+        deviations (numpy array of floats) : the mean minus each value
+        starts (numpy array of ints, optional) : first element of each
+            group of consecutive deviations, to compute the acceleration
+            of each group
+
+    Writes:
+        None
+
+    Returns:
+        acc (float or numpy array of floats) : the acceleration
+            statistic (of each group)
+    '''
+    # intermediate values
+    if starts is None:
+        SSD = np.sum(deviations**3)
+        SCD = np.sum(deviations**2)
+    else:
+        SSD = np.add.reduceat(deviations**3, starts)
+        SCD = np.add.reduceat(deviations**2, starts)
+
+    # dodge the ZeroDivision error
+    SCD = np.where(SCD == 0, 1e-12, SCD)
+    return SSD / (6 * SCD**1.5)
+
+
+def _bca_levels(prelim_result, boot_stats, alpha, a_hat):
+    '''
+    Compute the bias-corrected and accelerated percentiles of the
+    confidence limits of one or more statistics
+
+    Input:
+        prelim_result (float or numpy array of floats) : estimate of
+            each statistic computed from the full dataset
+        boot_stats (numpy array of floats) : estimates of the statistics
+            computed from iteratively resampling the dataset (one row
+            per resample)
+        alpha (float) : the uncertainty level
+        a_hat (float or numpy array of floats) : the acceleration
+            statistic of each statistic
+
+    Writes:
+        None
+
+    Returns:
+        alpha1, alpha2 (numpy arrays of floats) : the lower and upper
+            percentiles (0 - 100)
+        valid (numpy array of bools) : False where every resample is
+            below `prelim_result` (i.e., the percentiles are undefined)
+    '''
+    NIter = boot_stats.shape[0]
+
+    # number of results below the premlinary estimate
+    NumBelow = np.sum(boot_stats < prelim_result, axis=0).astype(float)
+    NumBelow = np.where(NumBelow == 0, 0.00001, NumBelow)
+    valid = NumBelow != NIter
+
+    # z-stats on the % of `NumBelow` and the confidence limits
+    z0 = dist.norm.ppf(np.where(valid, NumBelow / NIter, 0.5))
+    z1 = dist.norm.ppf(alpha/2.0)
+    z2 = dist.norm.ppf(1-alpha/2.0)
+
+    # refine the confidence limits (alphas)
+    z1Total = (z0 + (z0 + z1)) / (1 - a_hat*(z0+z1))
+    z2Total = (z0 + (z0 + z2)) / (1 - a_hat*(z0+z2))
+    alpha1 = dist.norm.cdf(z1Total)*100.0
+    alpha2 = dist.norm.cdf(z2Total)*100.0
+    return alpha1, alpha2, valid
+
+
+def logmean(data, axis=None):
+    '''
+    Arithmetic mean of the natural logs of the data
+    '''
+    return np.mean(np.log(data), axis=axis)
+
+
+def logstd(data, axis=None):
+    '''
+    Standard deviation of the natural logs of the data
+    '''
+    return np.std(np.log(data), axis=axis)
+
+
+def geomean(data, axis=None):
+    '''
+    Geometric mean of the data
+    '''
+    return np.exp(logmean(data, axis=axis))
+
+
+def _weighted_mean(weights, data):
+    '''
+    Mean of the data for each row of a (NIter, N) array of weights
+    '''
+    return weights.dot(data) / weights.sum(axis=1)
+
+
+def _weighted_var(weights, data):
+    '''
+    Population variance of the data for each row of a (NIter, N) array
+    of weights. The data are centered first to keep the sums accurate.
+    '''
+    centered = data - data.mean()
+    mean = _weighted_mean(weights, centered)
+    return np.maximum(_weighted_mean(weights, centered**2) - mean**2, 0)
+
+
+def _weighted_std(weights, data):
+    return np.sqrt(_weighted_var(weights, data))
+
+
+# statistics that can be evaluated as weighted sums of the data
+_WEIGHTED_STATS = [
+    (np.mean, _weighted_mean),
+    (np.var, _weighted_var),
+    (np.std, _weighted_std),
+    (logmean, lambda weights, data: _weighted_mean(weights, np.log(data))),
+    (logstd, lambda weights, data: _weighted_std(weights, np.log(data))),
+    (geomean, lambda weights, data: np.exp(_weighted_mean(weights, np.log(data)))),
+]
+
+
+def _batched_lstsq(design, y):
+    '''
+    Least-squares solutions of a stack of linear systems
+
+    Input:
+        design (numpy array of floats) : (B, N, k) stack of design
+            matrices
+        y (numpy array of floats) : (B, N) stack of observations
+
+    Writes:
+        None
+
+    Returns:
+        params (numpy array of floats) : (B, k) least-squares
+            parameters of each system
+    '''
+    XtX = np.einsum('bnk,bnl->bkl', design, design)
+    Xty = np.einsum('bnk,bn->bk', design, y)
+    try:
+        return np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # at least one resample is degenerate (e.g., a single x-value)
+        return np.einsum('bkn,bn->bk', np.linalg.pinv(design), y)
+
+
+def _grouped_mean(data, starts, sizes):
+    '''
+    Mean of each group of columns of a (NIter, N) array, where the
+    groups are consecutive and start at `starts`
+    '''
+    return np.add.reduceat(data, starts, axis=1) / sizes
+
+
+def _grouped_var(data, starts, sizes):
+    '''
+    Population variance of each group of columns of a (NIter, N) array
+    '''
+    mean = _grouped_mean(data, starts, sizes)
+    centered = data - np.repeat(mean, sizes, axis=1)
+    return _grouped_mean(centered**2, starts, sizes)
+
+
+def _grouped_std(data, starts, sizes):
+    return np.sqrt(_grouped_var(data, starts, sizes))
+
+
+# statistics that can be evaluated for all groups with `np.add.reduceat`
+_GROUPED_STATS = [
+    (np.mean, _grouped_mean),
+    (np.var, _grouped_var),
+    (np.std, _grouped_std),
+    (logmean, lambda data, starts, sizes: _grouped_mean(np.log(data), starts, sizes)),
+    (logstd, lambda data, starts, sizes: _grouped_std(np.log(data), starts, sizes)),
+    (geomean, lambda data, starts, sizes: np.exp(_grouped_mean(np.log(data), starts, sizes))),
+]
+
+
+def _group_ranks(data, starts, sizes):
+    '''
+    The ranks of the data within their groups (offset by the start of
+    each group) and the data sorted within each group
+    '''
+    N = data.shape[0]
+    groups = np.repeat(np.arange(sizes.shape[0]), sizes)
+    order = np.lexsort((data, groups))
+    ranks = np.empty(N, dtype=_index_dtype(N))
+    ranks[order] = np.arange(N)
+    return ranks, data[order]
+
+
+def _percentile_of_groups(sorted_data, boot_ranks, starts, sizes, q):
+    '''
+    Compute a percentile of each group of each row of resampled data,
+    given the ranks of the resampled values. The ranks of each group
+    must fall within the group's own columns. Instead of sorting each
+    row, the order statistics are found with a binary search of the
+    cumulative counts of the ranks, which takes linear time.
+
+    Input:
+        sorted_data (numpy array of floats) : the original data, sorted
+            within each group
+        boot_ranks (numpy array of ints) : (NIter, N) array of the
+            ranks of the resampled values
+        starts (numpy array of ints) : first column of each group
+        sizes (numpy array of ints) : number of columns of each group
+        q (float) : the percentile to compute (0 - 100)
+
+    Writes:
+        None
+
+    Returns:
+        stats (numpy array of floats) : (NIter, G) array of the
+            percentile of each group of each row
+    '''
+    rows, N = boot_ranks.shape
+    row_starts = N * np.arange(rows)[:, None]
+    counts = np.bincount((boot_ranks + row_starts).ravel(), minlength=rows * N)
+    cumulative = np.cumsum(counts)
+
+    position = (sizes - 1) * q / 100.0
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, sizes - 1)
+    frac = position - lower
+
+    # the rank of the kth smallest resampled value of each group is the
+    # first rank whose cumulative count exceeds k
+    def order_stat(k):
+        targets = row_starts + starts + k
+        ranks = np.searchsorted(cumulative, targets, side='right') - row_starts
+        return sorted_data[ranks]
+
+    a = order_stat(lower)
+    b = order_stat(upper)
+    return np.where(frac == 0.5, (a + b) / 2.0, a + (b - a) * frac)
+
+
+def _index_counts(index, N):
+    '''
+    Number of times each of `N` data points appears in each row of
+    a (NIter, N) array of resampled indices
+    '''
+    rows = index.shape[0]
+    offsets = (N * np.arange(rows))[:, None]
+    counts = np.bincount((index + offsets).ravel(), minlength=rows * N)
+    return counts.reshape(rows, N).astype(np.float64)
+
+
+def _statfxn_name(statfxn):
+    '''
+    A name that identifies `statfxn` across sessions, or None if it
+    can't be identified (e.g., lambdas, closures, and functions defined
+    in a script or an interactive session, which can be redefined under
+    the same name)
+    '''
+    if isinstance(statfxn, Percentile):
+        return repr(statfxn)
+
+    module = getattr(statfxn, '__module__', None)
+    name = getattr(statfxn, '__qualname__', None)
+    if module in (None, '__main__') or name is None or '<' in name:
+        return None
+    return '{}.{}'.format(module, name)
+
+
+def _seed_key(seed):
+    '''
+    A hashable description of a seed that always gives the same
+    random draws, or None for random states that don't
+    '''
+    if isinstance(seed, (int, np.integer)) and not isinstance(seed, bool):
+        return ('int', int(seed))
+    elif isinstance(seed, np.random.SeedSequence):
+        return ('seq', seed.entropy, tuple(seed.spawn_key))
+
+
+class ResultCache(object):
+    '''
+    Content-addressed on-disk cache of bootstrap results. Each result
+        is pickled to its own file in `directory`, named after a hash of
+        the data and of everything else that determines the result
+        (including `_CACHE_VERSION`). The total size of the results is
+        tracked as they're stored, and once it grows beyond `max_bytes`
+        the least recently used files are deleted until it's back under
+        three quarters of `max_bytes`.
+
+    Parameters
+    ----------
+    directory : string
+        Folder where the results are stored (created if needed)
+    max_bytes : optional int (default = 64 MB)
+        Maximum total size of the stored results
+
+    '''
+    def __init__(self, directory, max_bytes=2**26):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._total = sum(size for mtime, size, path in self._entries())
+
+    def key(self, data, statfxn, NIter, alpha, method, seed):
+        '''
+        Compute the cache key of a bootstrap result
+
+        Input:
+            data (array-like) : the bootstrapped data
+            statfxn (function) : the bootstrapped statistic
+            NIter (int) : number of bootstrap iterations
+            alpha (float) : the uncertainty level
+            method (string) : how the CIs are computed (e.g., 'BCA')
+            seed : seed of the random draws
+
+        Writes:
+            None
+
+        Returns:
+            key (string or None) : the key, or None if the result isn't
+                reproducible (i.e., unseeded or with an anonymous
+                `statfxn`) and shouldn't be cached
+        '''
+        name = _statfxn_name(statfxn)
+        seed = _seed_key(seed)
+        if name is None or seed is None:
+            return None
+
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        digest = hashlib.sha1(data.tobytes()).hexdigest()
+        description = (_CACHE_VERSION, digest, data.shape, name, int(NIter),
+                       float(alpha), method, seed)
+        return hashlib.sha1(repr(description).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key):
+        '''
+        Look up a result, or return None if it isn't cached
+        '''
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                value = pickle.load(cached)
+            # mark as recently used
+            os.utime(path, None)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value
+
+    def put(self, key, value):
+        '''
+        Store a result and evict the least recently used ones if the
+        cache is too large
+        '''
+        path = self._path(key)
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp, 'wb') as cached:
+            pickle.dump(value, cached, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(temp)
+        if os.path.exists(path):
+            size -= os.path.getsize(path)
+        os.replace(temp, path)
+
+        self._total += size
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.pkl'):
+                path = os.path.join(self.directory, filename)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        return sorted(entries)
+
+    def _evict(self):
+        # the directory is only listed when the tracked total is too
+        # large, which also picks up files written by other processes
+        entries = self._entries()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._total = total
+
+    def clear(self):
+        '''
+        Delete every stored result
+        '''
+        for mtime, size, path in self._entries():
+            os.remove(path)
+        self._total = 0
+
+
+def set_cache(directory, max_bytes=2**26):
+    '''
+    Enable the on-disk cache of bootstrap results used by `cached` and
+    `grouped_BCA` (and in turn by `wqio.Location` and
+    `wqio.DataCollection`). Only seeded results are cached.
+
+    Input:
+        directory (string or None) : folder where the results are
+            stored. None disables the cache.
+        max_bytes (int, optional) : maximum total size of the results
+
+    Writes:
+        None
+
+    Returns:
+        cache (ResultCache or None)
+    '''
+    global _CACHE
+    if directory is None:
+        _CACHE = None
+    else:
+        _CACHE = ResultCache(directory, max_bytes=max_bytes)
+    return _CACHE
+
+
+def get_cache():
+    '''
+    The current on-disk cache of bootstrap results, if enabled
+    '''
+    return _CACHE
+
+
+def cached(compute, data, statfxn, NIter, alpha, method, seed):
+    '''
+    Look up a bootstrap result in the on-disk cache, computing and
+    storing it if it's not there yet
+
+    Input:
+        compute (function) : function without arguments that computes
+            the result (e.g., `lambda: Stat(...).BCA()`)
+        data, statfxn, NIter, alpha, method, seed : everything that
+            determines the result (see `ResultCache.key`)
+
+    Writes:
+        None
+
+    Returns:
+        The output of `compute`
+    '''
+    cache = get_cache()
+    key = None
+    if cache is not None:
+        key = cache.key(data, statfxn, NIter, alpha, method, seed)
+
+    if key is not None:
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    value = compute()
+    if key is not None:
+        cache.put(key, value)
+    return value
+
+
+class Percentile(object):
+    '''
+    Statistic computing a given percentile of the data, e.g.,
+    `Percentile(90)`. Behaves like `numpy.percentile` with a fixed `q`,
+    but lets `Stat` recognize it and use its fast order statistic path
+    (as it does with `numpy.median`).
+
+    Parameters
+    ----------
+    q : float
+        The percentile to compute (0 - 100)
+
+    '''
+    def __init__(self, q):
+        self.q = q
+
+    def __call__(self, data, axis=None):
+        return np.percentile(data, self.q, axis=axis)
+
+    def __repr__(self):
+        return 'Percentile({})'.format(self.q)
+
+
+def make_boot_index(N, NIter, engine='vectorized', dtype=None,
+                    random_state=None):
+    '''
+    Generate an array of indices of bootstrap sample sets. The array
+    can be passed to several `Stat` objects (via `boot_index`) so that
+    they all evaluate their statistic against the same resamples.
+
+    Input:
+        N (int) : number of data points in the dataset being resampled
+        NIter (int) : number of bootstrap iterations (rows)
+        engine (string, default = 'vectorized') : 'vectorized' draws
+            the full array in a single call to the random number
+            generator. 'loop' draws one row at a time.
+        dtype (numpy dtype, default = None) : integer type of the
+            output. When provided (e.g., numpy.uint16), the indices are
+            drawn in blocks and cast so that a full array of native
+            integers is never created. The values drawn are the same.
+        random_state (None, int, SeedSequence, RandomState or Generator,
+            default = None) : source of the random draws. None uses
+            the global numpy random state.
+
+    Writes:
+        None
+
+    Returns:
+        index (numpy array of ints) : (NIter, N) array of random indices
+            (with replacement) into the dataset
+    '''
+    random_state = _check_random_state(random_state)
+
+    if engine == 'vectorized' and dtype is None:
+        index = _randint(random_state, N, (NIter, N))
+
+    elif engine == 'vectorized':
+        index = np.empty((NIter, N), dtype=dtype)
+        rows = _block_rows(N * np.dtype(int).itemsize)
+        for start in range(0, NIter, rows):
+            stop = min(start + rows, NIter)
+            index[start:stop] = _randint(random_state, N, (stop - start, N))
+
+    elif engine == 'loop':
+        index = np.empty((NIter, N), dtype=dtype or int)
+        for n in range(NIter):
+            index[n] = _randint(random_state, N, N)
+
+    else:
+        raise ValueError("`engine` must be 'vectorized' or 'loop'")
+
+    return index
+
+
+class _bootstrapMixin(object):
+    '''
+    Class for using bootstrap techniques to estimate a statistic and its
+        confidence intervals.
+
+    Parameters
+    ----------
+    inputdata : array-like
+        The data that we're describing
+    statfxn : optional function or lambda (default is numpy.median)
+        Function that takes `inputdata` as the sole argument and return
+        a single float value.
+    alpha : optional float (default = 0.05)
+        The uncertainty level e.g., for 95% confidence intervals,
+        `alpha` = 0.05
+    NIter : optional int (default = 5000)
+        The number of interation to use in the bootstrapping routine
+    engine : optional string (default = 'vectorized')
+        How the resampled indices are drawn. 'vectorized' draws the
+        full (NIter, N) index array in a single call to the random
+        number generator. 'loop' draws one row at a time. Both consume
+        the random state identically, so the results are the same for
+        a given seed.
+    boot_index : optional array of ints or None (default)
+        A precomputed (NIter, N) array of resampled indices (see
+        `make_boot_index`). When provided, no new random draws are
+        made and `NIter` is taken from the number of rows.
+    storage : optional string (default = 'array')
+        How the resamples are kept on the object. 'array' stores a
+        full float copy of every resample in `_boot_array`. 'index'
+        only stores the resampled indices in `_boot_index` using the
+        smallest unsigned integer type that fits the data (uint16 for
+        up to 65,536 points) and gathers the data in small blocks when
+        the statistic is computed.
+    chunk_size : optional int or None (default)
+        When provided, the resamples are drawn and reduced `chunk_size`
+        rows at a time and only the bootstrapped statistics are kept
+        (i.e., neither `_boot_array` nor `_boot_index` are stored).
+        This bounds the memory used by large values of `NIter`. The
+        random draws are the same as without chunking. Takes
+        precedence over `storage`.
+    seed : optional int, numpy.random.Generator, or None (default)
+        Seed (or source) of the random draws. None uses the global
+        numpy random state. An int gives the same draws as calling
+        `numpy.random.seed` with it beforehand. RandomState and
+        SeedSequence objects are also accepted.
+    n_jobs : optional int (default = 1)
+        Number of workers among which the iterations are split. When
+        greater than 1 (or when `executor` is provided), each worker
+        draws from its own random stream spawned from `seed`, so a
+        given (`seed`, `n_jobs`) pair always gives the same results.
+        Only the bootstrapped statistics are kept on the object.
+    executor : optional concurrent.futures.Executor or None (default)
+        Pool used to run the workers. If None, a ProcessPoolExecutor
+        with `n_jobs` processes is used, in which case `statfxn` (and
+        `curvefitfxn`) must be picklable (i.e., not lambdas).
+    weights : optional string or None (default)
+        Only for `Stat`. Represents each resample as a vector of weights
+        on the original data instead of a gathered copy, so that
+        statistics that are weighted sums of the data are computed with
+        a single matrix product. 'multinomial' uses the counts of the
+        usual resampled indices (i.e., same results as the default),
+        'poisson' uses independent Poisson(1) counts, and 'dirichlet'
+        uses flat Dirichlet weights (i.e., the Bayesian bootstrap).
+        Only supported for `numpy.mean`, `numpy.var`, `numpy.std`,
+        `logmean`, `logstd`, and `geomean`.
+    tol : optional float or None (default)
+        Only for `Stat`. When provided, the resamples are drawn in
+        batches of `chunk_size` (500 if not set) and the bootstrapping
+        stops as soon as the Monte Carlo standard error of every
+        confidence limit (percentile and BCA) is below `tol`. The
+        standard errors are estimated from the spread of the limits of
+        each batch (i.e., batch means), after at least four batches.
+        `NIter` is then the maximum number of iterations.
+    acceleration : optional string (default = 'skew')
+        Only for `Stat`. How the acceleration of the BCA method is
+        estimated by default (see `Stat.BCA`). Also used for the BCA
+        limits checked against `tol`.
+    linear : optional bool (default = False)
+        Only for `Fit`. Declares that `curvefitfxn` is linear in its
+        parameters (e.g., a line or a polynomial), in which case every
+        resample is fit at once by solving its least-squares normal
+        equations instead of calling `statfxn` on each one.
+    warm_start : optional bool (default = False)
+        Only for `Fit`. Starts the fit of every resample from
+        `prelim_result` (i.e., passes it to `statfxn` as `p0`).
+    maxfev : optional int or None (default)
+        Only for `Fit`. Maximum number of function evaluations of the
+        fit of each resample (passed to `statfxn`). Resamples that fail
+        to converge are recorded as rows of NaN in `_boot_stats` and
+        are ignored (with a RuntimeWarning) when the confidence
+        intervals are computed. A RuntimeError is raised if every fit
+        failed.
+    dtype : optional numpy float type (default = numpy.float64)
+        Precision of the resampled data and of the bootstrapped
+        statistics. numpy.float32 halves the memory of `_boot_array`
+        and speeds up the reductions, at the cost of about 7
+        significant digits in each resample. `prelim_result` is always
+        computed at full precision, but it's compared to the
+        bootstrapped statistics at `dtype` precision in the BCA method.
+
+    Attributes
+    ----------
+    data : numpy array
+        Array of the data that we're describing
+    statfxn : function or lambda
+        Function that takes `inputdata` as the sole argument and return
+        a single float value.
+    alpha : float
+        The uncertainty level of the confidence intervals
+    NIter : int
+        The number of interation used in the bootstrapping routine
+        (i.e., fewer than requested if an adaptive run converged early)
+    engine : string
+        The method used to draw the resampled indices
+    boot_index : array of ints or None
+        The precomputed resampled indices, if any
+    storage : string
+        How the resamples are kept on the object ('array' or 'index')
+    chunk_size : int or None
+        The number of resamples drawn and reduced at a time, if any
+    seed : int, Generator or None
+        Seed (or source) of the random draws
+    n_jobs : int
+        Number of workers among which the iterations are split
+    executor : concurrent.futures.Executor or None
+        Pool used to run the workers
+    weights : string or None
+        How the resamples are weighted, if at all
+    dtype : numpy float type
+        Precision of the resampled data and bootstrapped statistics
+    tol : float or None
+        Tolerance on the standard error of the confidence limits, if any
+    acceleration : string
+        Only for `Stat`. The default estimate of the BCA acceleration
+    converged : bool
+        Whether the adaptive run met `tol` before `NIter` iterations
+        (always True when `tol` is None)
+    n_failures : int
+        Only for `Fit`. The number of resamples whose fit failed
+    prelim_result : float
+        Estimate of the statistic based on the original dataset
+
+    Methods (see individual docstrings):
+    -----------------------------------
+    _setup
+    BCA
+    percentile
+
+    '''
+    weights = None
+    dtype = np.float64
+
+    def _acceleration(self):
+        '''
+        Compute the acceleration statistic
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            acc (float) : the acceleration statistic
+        '''
+        return _skew_acceleration(self.data.mean() - self.data)
+
+    def _jackknife_stats(self):
+        '''
+        Compute the statistic of each leave-one-out subset of the data
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            jack_stats (numpy array of floats) : the statistic computed
+                with each data point left out in turn
+        '''
+        return _jackknife(self.data, self.statfxn)
+
+    def _jackknife_acceleration(self):
+        '''
+        Compute the acceleration statistic from the jackknife estimates
+            of the statistic (Efron and Tibshirani, 1993, eq. 14.15)
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            acc (float) : the acceleration statistic
+        '''
+        jack_stats = self._jackknife_stats()
+        return _skew_acceleration(jack_stats.mean() - jack_stats)
+
+    def _make_boot_index(self, N, dtype=None):
+        '''
+        Generate an array of indices of the bootstrap sample sets
+
+        Input:
+            N (int) : number of data points in the dataset being resampled
+            dtype (numpy dtype, default = None) : integer type of the
+                output
+
+        Writes:
+            None
+
+        Returns:
+            index (numpy array of ints) : (NIter, N) array of random indices
+                (with replacement) into the dataset
+        '''
+        if self.boot_index is None:
+            index = make_boot_index(N, self.NIter, engine=self.engine,
+                                    dtype=dtype,
+                                    random_state=self._random_state)
+        else:
+            index = np.asarray(self.boot_index)
+            if index.shape != (self.NIter, N):
+                raise ValueError("`boot_index` must have shape (NIter, N)")
+            if dtype is not None:
+                index = index.astype(dtype, copy=False)
+
+        return index
+
+    def _stacked_data(self):
+        '''
+        The data being resampled as a float array. The input and output
+            data are stacked into columns if we're bootstrapping a curve
+            fit.
+        '''
+        if hasattr(self, 'outputdata'):
+            data = np.vstack([self.data, self.outputdata]).T
+        else:
+            data = self.data
+
+        return np.asarray(data, dtype=self.dtype)
+
+    def _make_bootstrap_array(self):
+        '''
+        Generate an array of bootstrap sample sets
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            bootArray (nump array of floats) : a collection of random samples
+                pulled from the the dataset
+        '''
+        data = self._stacked_data()
+
+        # random samples (with replacement) of the data
+        index = self._make_boot_index(data.shape[0])
+        bootArray = data[index]
+
+        # we're done
+        return bootArray
+
+    def _make_resamples(self):
+        '''
+        Draw the bootstrap sample sets and store them according to
+            `self.storage`
+
+        Input:
+            None
+
+        Writes:
+            _boot_array (if `storage` is 'array') or _boot_index (if
+                `storage` is 'index'). Nothing is written when
+                `chunk_size` is set or the work is split among workers.
+
+        Returns:
+            None
+        '''
+        self._random_state = _check_random_state(self.seed)
+
+        if self.chunk_size is not None and self.chunk_size < 1:
+            raise ValueError("`chunk_size` must be a positive integer")
+
+        if np.dtype(self.dtype).kind != 'f':
+            raise ValueError("`dtype` must be a floating point type")
+
+        # resamples are drawn on the fly by the chunks or the workers
+        if self.chunk_size is not None or self._parallel:
+            return
+
+        elif self.weights is not None:
+            return
+
+        elif self.storage == 'array':
+            self._boot_array = self._make_bootstrap_array()
+
+        elif self.storage == 'index':
+            N = np.shape(self.data)[0]
+            self._boot_index = self._make_boot_index(N, dtype=_index_dtype(N))
+
+        else:
+            raise ValueError("`storage` must be 'array' or 'index'")
+
+    def _iter_index_blocks(self):
+        '''
+        Generate blocks of rows of the resampled indices. When
+            `chunk_size` is set, the indices of each block are drawn on
+            the fly.
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of ints) : consecutive rows of the
+                resampled indices
+        '''
+        data = self._stacked_data()
+        N = data.shape[0]
+        if self.chunk_size is not None:
+            for start in range(0, self.NIter, self.chunk_size):
+                stop = min(start + self.chunk_size, self.NIter)
+                if self.boot_index is None:
+                    yield make_boot_index(N, stop - start, engine=self.engine,
+                                          random_state=self._random_state)
+                else:
+                    yield self._make_boot_index(N)[start:stop]
+
+        elif self.storage == 'index':
+            rows = _block_rows(data.nbytes)
+            for start in range(0, self.NIter, rows):
+                yield self._boot_index[start:start + rows]
+
+        else:
+            raise ValueError("indices are not kept with storage='array'")
+
+    def _iter_boot_blocks(self):
+        '''
+        Generate blocks of rows of the bootstrap sample sets. When only
+            the indices are stored, the data are gathered one block at a
+            time so that the full array is never in memory. When
+            `chunk_size` is set, the indices of each block are drawn
+            on the fly as well.
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of floats) : consecutive rows of the
+                bootstrap sample sets
+        '''
+        if self.chunk_size is None and self.storage == 'array':
+            yield self._boot_array
+
+        else:
+            data = self._stacked_data()
+            for index in self._iter_index_blocks():
+                yield data[index]
+
+    @property
+    def _parallel(self):
+        return self.n_jobs > 1 or self.executor is not None
+
+    def _parallel_boot_stats(self, args, kwargs):
+        '''
+        Split the bootstrap iterations among `n_jobs` workers, each
+            with an independent random stream spawned from `seed`.
+
+        Input:
+            args (tuple) : positional arguments used to create the
+                bootstrap object in each worker
+            kwargs (dict) : keyword arguments used to create the
+                bootstrap object in each worker
+
+        Writes:
+            None
+
+        Returns:
+            boot_stats (numpy array of floats) : estimates of the statistic
+                computed from iteratively resampling the dataset
+        '''
+        n_jobs = max(1, min(self.n_jobs, self.NIter))
+        bounds = np.linspace(0, self.NIter, n_jobs + 1).astype(int)
+
+        # an unseeded run still respects `numpy.random.seed`
+        seeds = spawn_seeds(self.seed, n_jobs)
+
+        executor = self.executor
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=n_jobs)
+
+        try:
+            futures = []
+            for start, stop, seed in zip(bounds[:-1], bounds[1:], seeds):
+                worker_kwargs = dict(kwargs, NIter=stop - start, seed=seed)
+                if self.boot_index is not None:
+                    worker_kwargs['boot_index'] = self.boot_index[start:stop]
+
+                futures.append(executor.submit(
+                    _boot_stats_worker, type(self), args, worker_kwargs
+                ))
+
+            boot_stats = np.concatenate([f.result() for f in futures])
+
+        finally:
+            if self.executor is None:
+                executor.shutdown()
+
+        return boot_stats
+
+    def _bca_prelim(self, prelim_result):
+        '''
+        Round the preliminary result to the precision (`dtype`) of the
+            bootstrapped statistics. Otherwise, resamples whose statistic
+            equals `prelim_result` but got rounded down would be counted
+            as below it, which biases the BCA correction.
+        '''
+        return np.asarray(prelim_result, dtype=self.dtype)
+
+    def _bca_alphas(self, prelim_result, boot_stats, a_hat):
+        '''
+        Compute the bias-corrected and accelerated percentiles of the
+            confidence limits
+
+        Input:
+            prelim_result (float) : estimate of the statistic computed from the
+                full dataset
+            boot_stats (numpy array of floats) : estimates of the statistic
+                computed from iteratively resampling the dataset
+            a_hat (float) : the acceleration statistic
+
+        Writes:
+            None
+
+        Returns:
+            alphas (tuple of floats) : the lower and upper percentiles
+                (0 - 100), or None if every resample is below
+                `prelim_result`
+        '''
+        alpha1, alpha2, valid = _bca_levels(self._bca_prelim(prelim_result),
+                                            boot_stats, self.alpha, a_hat)
+        if not valid:
+            return None
+
+        return float(alpha1), float(alpha2)
+
+    def _eval_BCA(self, prelim_result, boot_stats, a_hat=None):
+        '''
+        Evaluate the BCA method of aquiring confidence intervals around a
+            statistic
+
+        Input:
+            prelim_result (float) : estimate of the statistic computed from the
+                full dataset
+            boot_stats (numpy array of floats) : estimates of the statistic
+                computed from iteratively resampling the dataset
+            a_hat (float, optional) : the acceleration statistic. Computed
+                with `_acceleration` if not provided.
+
+        Writes:
+            None
+
+        Returns:
+            result (float) : refined(?) estimate of the statistic
+            CI (numpy array of floats) : confidence intervals of statistic
+
+        TODO: fallback to percentile method should raise a warning
+        '''
+
+        # compute the acceleration
+        if a_hat is None:
+            a_hat = self._acceleration()
+
+        alphas = self._bca_alphas(prelim_result, boot_stats, a_hat)
+        if alphas is not None:
+            alpha1, alpha2 = alphas
+
+            # take the mean of the `boot_stats`
+            result = boot_stats.mean()
+
+            # confidence intervals from the new alphas
+            CI = np.array([stats.scoreatpercentile(boot_stats, alpha1),
+                          stats.scoreatpercentile(boot_stats, alpha2)])
+
+            # fall back to the standard percentile method if the results
+            # don't make any sense
+            if result < CI[0] or CI[1] < result:
+                result, CI = self._eval_percentile(boot_stats)
+        else:
+            result, CI = self._eval_percentile(boot_stats)
+
+        return result, CI
+
+    def _eval_percentile(self, boot_stats):
+        '''
+        Evaluate the percentile method of aquiring confidence intervals around
+            a statistic
+
+        Input:
+            boot_stats (numpy array of floats) : estimates of the statistic
+                computed from iteratively resampling the dataset
+
+        Writes:
+            None
+
+        Returns:
+            result (float) : refined(?) estimate of the statistic
+            CI (numpy array of floats) : confidence intervals of statistic
+        '''
+        # compute the `alpha/2` and `1-alpha/2` percentiles of `boot_stats`
+        CI = np.array([
+            np.percentile(boot_stats, self.alpha*50, axis=0),
+            np.percentile(boot_stats, 100-self.alpha*50, axis=0),
+        ])
+
+        # median of `boot_stats`
+        result = np.percentile(boot_stats, 50, axis=0)
+
+        return result, CI
+
+    def _eval_BCA_columns(self, prelim_results, boot_stats, a_hat=None):
+        '''
+        Evaluate the BCA method of aquiring confidence intervals around
+            several statistics at once. Equivalent to calling `_eval_BCA`
+            on each column of `boot_stats`.
+
+        Input:
+            prelim_results (numpy array of floats) : estimate of each of
+                the `k` statistics computed from the full dataset
+            boot_stats (numpy array of floats) : (NIter, k) array of the
+                estimates of the statistics computed from iteratively
+                resampling the dataset
+            a_hat (float or numpy array of floats, optional) : the
+                acceleration statistic (of each column). Computed with
+                `_acceleration` if not provided.
+
+        Writes:
+            None
+
+        Returns:
+            results (numpy array of floats) : refined(?) estimate of each
+                statistic
+            CI (numpy array of floats) : (k, 2) array of the confidence
+                intervals of each statistic
+        '''
+        boot_stats = np.asarray(boot_stats, dtype=np.float64)
+        if a_hat is None:
+            a_hat = self._acceleration()
+
+        alpha1, alpha2, valid = _bca_levels(self._bca_prelim(prelim_results),
+                                            boot_stats, self.alpha, a_hat)
+
+        # take the mean of the `boot_stats`
+        results = boot_stats.mean(axis=0)
+
+        # confidence intervals from the new alphas
+        sorted_stats = np.sort(boot_stats, axis=0)
+        CI = np.column_stack([_percentile_of_columns(sorted_stats, alpha1),
+                              _percentile_of_columns(sorted_stats, alpha2)])
+
+        # fall back to the standard percentile method if the results
+        # don't make any sense
+        fallback = ~valid | (results < CI[:, 0]) | (CI[:, 1] < results)
+        if fallback.any():
+            per_results, per_CI = self._eval_percentile_columns(boot_stats)
+            results = np.where(fallback, per_results, results)
+            CI = np.where(fallback[:, None], per_CI, CI)
+
+        return results, CI
+
+    def _eval_percentile_columns(self, boot_stats):
+        '''
+        Evaluate the percentile method of aquiring confidence intervals
+            around several statistics at once
+
+        Input:
+            boot_stats (numpy array of floats) : (NIter, k) array of the
+                estimates of the statistics computed from iteratively
+                resampling the dataset
+
+        Writes:
+            None
+
+        Returns:
+            results (numpy array of floats) : median of each column
+            CI (numpy array of floats) : (k, 2) array of the confidence
+                intervals of each statistic
+        '''
+        lower, results, upper = np.percentile(
+            boot_stats, [self.alpha*50, 50, 100-self.alpha*50], axis=0
+        )
+        return results, np.column_stack([lower, upper])
+
+
+class Stat(_bootstrapMixin):
+
+    def __init__(self, inputdata, statfxn=np.median, alpha=0.05, NIter=5000,
+                 engine='vectorized', boot_index=None, storage='array',
+                 chunk_size=None, seed=None, n_jobs=1, executor=None,
+                 weights=None, tol=None, dtype=np.float64,
+                 acceleration='skew'):
+        self.data = inputdata
+        self.statfxn = statfxn
+        self.alpha = alpha
+        self.engine = engine
+        self.boot_index = boot_index
+        if boot_index is None:
+            self.NIter = NIter
+        else:
+            self.NIter = np.shape(boot_index)[0]
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.n_jobs = n_jobs
+        self.executor = executor
+        self.weights = weights
+        self.dtype = dtype
+        self.tol = tol
+        self.acceleration = acceleration
+        self.converged = True
+        if tol is not None:
+            if self._parallel:
+                raise ValueError("`tol` can't be used with multiple workers")
+            if chunk_size is None:
+                self.chunk_size = 500
+
+        self._make_resamples()
+        self._setup()
+
+    def _setup(self):
+        '''
+        Utility method to setup the _bootstrapMixin object's attributes of the
+            preliminary results and the boot strapped
+        '''
+        self.prelim_result = self.statfxn(self.data)
+        if self._parallel:
+            self._boot_stats = self._parallel_boot_stats(
+                (self.data,),
+                dict(statfxn=self.statfxn, alpha=self.alpha,
+                     engine=self.engine, storage=self.storage,
+                     chunk_size=self.chunk_size, weights=self.weights,
+                     dtype=self.dtype)
+            )
+        elif self.tol is not None:
+            self._boot_stats = self._adaptive_boot_stats()
+        else:
+            self._boot_stats = np.concatenate(list(self._iter_stat_blocks()))
+
+        self._boot_stats = self._boot_stats.astype(self.dtype, copy=False)
+
+    def _iter_stat_blocks(self):
+        '''
+        Generate blocks of the bootstrapped statistic using the fastest
+            method available for `statfxn` and the way the resamples
+            are stored
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of floats) : the statistic of consecutive
+                resamples
+        '''
+        if self.weights is not None:
+            return self._iter_weighted_stats()
+        elif self._quantile is not None and self._keeps_index:
+            return self._iter_quantile_stats(self._quantile)
+        else:
+            return (self.statfxn(boot, axis=1) for boot in self._iter_boot_blocks())
+
+    def _endpoint_errors(self, batches, a_hat):
+        '''
+        Estimate the Monte Carlo standard errors of the percentile and
+            BCA confidence limits with batch means: every limit is
+            computed within each batch of resamples, and the spread of
+            those limits gives the standard error of the limit of all of
+            the batches. Unlike the spread of the order statistics
+            around a limit, this doesn't vanish when the statistic only
+            takes a few distinct values (e.g., the median of a small
+            dataset).
+
+        Input:
+            batches (list of numpy arrays of floats) : estimates of the
+                statistic computed from each batch of resamples
+            a_hat (float) : the acceleration statistic
+
+        Writes:
+            None
+
+        Returns:
+            errors (numpy array of floats) : the standard error of each
+                confidence limit
+        '''
+        boot_stats = np.concatenate(batches)
+        levels = [self.alpha*50, 100-self.alpha*50]
+        alphas = self._bca_alphas(self.prelim_result, boot_stats, a_hat)
+        if alphas is not None:
+            levels.extend(alphas)
+
+        limits = np.array([np.percentile(batch, levels) for batch in batches])
+        return limits.std(axis=0, ddof=1) / np.sqrt(len(batches))
+
+    def _adaptive_boot_stats(self):
+        '''
+        Bootstrap the statistic in batches of `chunk_size` resamples until
+            the standard errors of the confidence limits are all below
+            `tol` or `NIter` iterations are reached
+
+        Input:
+            None
+
+        Writes:
+            NIter : the number of iterations actually used
+            converged : whether `tol` was met
+
+        Returns:
+            boot_stats (numpy array of floats) : estimates of the statistic
+                computed from iteratively resampling the dataset
+        '''
+        a_hat = self._get_acceleration(self.acceleration)
+        batches = []
+        self.converged = False
+        for block in self._iter_stat_blocks():
+            batches.append(block)
+
+            # don't trust the spread of the limits of only a few batches
+            if len(batches) >= 4:
+                if np.all(self._endpoint_errors(batches, a_hat) < self.tol):
+                    self.converged = True
+                    break
+
+        boot_stats = np.concatenate(batches)
+        self.NIter = boot_stats.shape[0]
+        return boot_stats
+
+    @property
+    def _quantile(self):
+        '''
+        The percentile computed by `statfxn`, if it is known to be one
+        '''
+        if self.statfxn is np.median:
+            return 50.0
+        elif isinstance(self.statfxn, Percentile):
+            return self.statfxn.q
+
+    @property
+    def _keeps_index(self):
+        return self.chunk_size is not None or self.storage == 'index'
+
+    def _iter_weight_blocks(self):
+        '''
+        Generate blocks of rows of the resampling weights
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of floats) : consecutive rows of the
+                (NIter, N) array of resampling weights
+        '''
+        N = np.shape(self.data)[0]
+        rows = self.chunk_size or _block_rows(N * 8)
+        for start in range(0, self.NIter, rows):
+            stop = min(start + rows, self.NIter)
+            size = (stop - start, N)
+            if self.weights == 'multinomial':
+                if self.boot_index is None:
+                    index = make_boot_index(N, stop - start, engine=self.engine,
+                                            random_state=self._random_state)
+                else:
+                    index = self._make_boot_index(N)[start:stop]
+                weights = _index_counts(index, N)
+
+            elif self.weights == 'poisson':
+                weights = self._random_state.poisson(1.0, size=size).astype(np.float64)
+
+                # redraw the (rare) resamples with no data at all
+                empty = weights.sum(axis=1) == 0
+                while empty.any():
+                    weights[empty] = self._random_state.poisson(
+                        1.0, size=(empty.sum(), N)
+                    )
+                    empty = weights.sum(axis=1) == 0
+
+            elif self.weights == 'dirichlet':
+                weights = self._random_state.standard_exponential(size=size)
+
+            else:
+                raise ValueError("`weights` must be 'multinomial', 'poisson', "
+                                 "or 'dirichlet'")
+
+            yield weights.astype(self.dtype, copy=False)
+
+    def _iter_weighted_stats(self):
+        '''
+        Compute the statistic of every resample as a weighted sum of the
+            data (see `weights`)
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of floats) : the statistic of consecutive
+                resamples
+        '''
+        for statfxn, weighted_fxn in _WEIGHTED_STATS:
+            if self.statfxn is statfxn:
+                break
+        else:
+            raise ValueError("`weights` can't be used with {}".format(self.statfxn))
+
+        data = np.asarray(self.data, dtype=self.dtype)
+        for weights in self._iter_weight_blocks():
+            yield weighted_fxn(weights, data)
+
+    def _iter_quantile_stats(self, q):
+        '''
+        Compute a percentile of every resample from the order statistics
+            of the data. The data are sorted once and each resample is
+            reduced to the sorted ranks of its values, which are compact
+            integers that are much faster to sort than gathered floats.
+
+        Input:
+            q (float) : the percentile to compute (0 - 100)
+
+        Writes:
+            None
+
+        Yields:
+            block (numpy array of floats) : the percentile of consecutive
+                resamples
+        '''
+        data = np.asarray(self.data, dtype=self.dtype)
+        N = data.shape[0]
+
+        order = np.argsort(data, kind='mergesort')
+        ranks = np.empty(N, dtype=_index_dtype(N))
+        ranks[order] = np.arange(N)
+        sorted_data = data[order]
+
+        for index in self._iter_index_blocks():
+            boot_ranks = np.sort(ranks[index], axis=1)
+            yield _percentile_of_sorted(sorted_data, boot_ranks, q)
+
+    def _get_acceleration(self, acceleration):
+        '''
+        Compute the acceleration statistic with the requested method
+            ('skew' or 'jackknife', see `BCA`)
+        '''
+        if acceleration == 'skew':
+            return self._acceleration()
+        elif acceleration == 'jackknife':
+            return self._jackknife_acceleration()
+        else:
+            raise ValueError("`acceleration` must be 'skew' or 'jackknife'")
+
+    def BCA(self, acceleration=None):
+        '''
+        BCA method of aquiring confidence intervals
+
+        Input:
+            acceleration (string, default = None) : how the
+                acceleration is estimated. 'skew' uses the skewness of
+                the data. 'jackknife' uses the leave-one-out estimates
+                of `statfxn`, which is appropriate for statistics other
+                than the mean. None uses the `acceleration` given to the
+                constructor.
+        '''
+        if acceleration is None:
+            acceleration = self.acceleration
+        a_hat = self._get_acceleration(acceleration)
+        return self._eval_BCA(self.prelim_result, self._boot_stats, a_hat=a_hat)
+
+    def percentile(self):
+        '''
+        percentile method of aquiring confidence intervals
+        '''
+        return self._eval_percentile(self._boot_stats)
+
+
+class Fit(_bootstrapMixin):
+    def __init__(self, inputdata, outputdata, curvefitfxn,
+                 statfxn=opt.curve_fit, alpha=0.05, NIter=5000,
+                 engine='vectorized', boot_index=None, storage='array',
+                 chunk_size=None, seed=None, n_jobs=1, executor=None,
+                 linear=False, warm_start=False, maxfev=None,
+                 dtype=np.float64):
+        self.data = np.array(inputdata, dtype=np.float64)
+        self.outputdata = np.array(outputdata, dtype=np.float64)
+        self.curvefitfxn = curvefitfxn
+        self.statfxn = statfxn
+        self.alpha = alpha
+        self.engine = engine
+        self.boot_index = boot_index
+        if boot_index is None:
+            self.NIter = NIter
+        else:
+            self.NIter = np.shape(boot_index)[0]
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.n_jobs = n_jobs
+        self.executor = executor
+        self.linear = linear
+        self.warm_start = warm_start
+        self.maxfev = maxfev
+        self.dtype = dtype
+        self._make_resamples()
+        self._setup()
+
+    def _setup(self):
+        '''
+        Utility method to setup the _boot_strap object's attributes of the
+            preliminary results and the boot strapped
+        '''
+        # prelim results
+        self.prelim_result, pcov = self.statfxn(self.curvefitfxn,
+                                                self.data,
+                                                self.outputdata)
+
+        if self._parallel:
+            self._boot_stats = self._parallel_boot_stats(
+                (self.data, self.outputdata, self.curvefitfxn),
+                dict(statfxn=self.statfxn, alpha=self.alpha,
+                     engine=self.engine, storage=self.storage,
+                     chunk_size=self.chunk_size, linear=self.linear,
+                     warm_start=self.warm_start, maxfev=self.maxfev,
+                     dtype=self.dtype)
+            )
+
+        elif self.linear:
+            self._boot_stats = self._linear_boot_stats()
+
+        else:
+            # setup bootstrap stats array
+            self._boot_stats = np.empty([self.NIter, self.prelim_result.shape[0]],
+                                        dtype=self.dtype)
+
+            # fill in the results
+            fit_kwargs = {}
+            if self.warm_start:
+                fit_kwargs['p0'] = self.prelim_result
+            if self.maxfev is not None:
+                fit_kwargs['maxfev'] = self.maxfev
+
+            boots = chain.from_iterable(self._iter_boot_blocks())
+            for r, boot in enumerate(boots):
+                try:
+                    fitparams, covariance = self.statfxn(self.curvefitfxn,
+                                                         boot[:, 0], boot[:, 1],
+                                                         **fit_kwargs)
+                except (RuntimeError, ValueError, np.linalg.LinAlgError):
+                    fitparams = np.nan
+                self._boot_stats[r] = fitparams
+
+        self._boot_stats = self._boot_stats.astype(self.dtype, copy=False)
+        self.n_failures = int(np.isnan(self._boot_stats).any(axis=1).sum())
+
+    @property
+    def _valid_boot_stats(self):
+        '''
+        The bootstrapped fit parameters of the resamples that didn't
+        fail. Warns if any failed and raises a RuntimeError if they all
+        did.
+        '''
+        if self.n_failures == self._boot_stats.shape[0]:
+            raise RuntimeError("the fits of all {} resamples failed (see "
+                               "`maxfev`)".format(self.n_failures))
+        elif self.n_failures > 0:
+            warnings.warn("the fits of {} of {} resamples failed and are "
+                          "ignored".format(self.n_failures,
+                                           self._boot_stats.shape[0]),
+                          RuntimeWarning)
+
+        return self._boot_stats[~np.isnan(self._boot_stats).any(axis=1)]
+
+    def _design_matrix(self, x):
+        '''
+        Evaluate the columns of the design matrix of a `curvefitfxn`
+            that is linear in its parameters
+
+        Input:
+            x (numpy array of floats) : values of the independent
+                variable (any shape)
+
+        Writes:
+            None
+
+        Returns:
+            design (numpy array of floats) : `x.shape + (k,)` array, where
+                each of the `k` columns is `curvefitfxn` evaluated with
+                a unit vector of parameters
+        '''
+        columns = [
+            np.broadcast_to(self.curvefitfxn(x, *unit), x.shape)
+            for unit in np.eye(self.prelim_result.shape[0])
+        ]
+        return np.stack(columns, axis=-1)
+
+    def _linear_boot_stats(self):
+        '''
+        Fit every resample of a linear `curvefitfxn` with a batched
+            least-squares solution
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            boot_stats (numpy array of floats) : (NIter, k) array of the
+                fit parameters of each resample
+        '''
+        design = self._design_matrix(self.data)
+        expected = self.curvefitfxn(self.data, *self.prelim_result)
+        if not np.allclose(design.dot(self.prelim_result), expected):
+            raise ValueError("`curvefitfxn` is not linear in its parameters")
+
+        return np.concatenate([
+            _batched_lstsq(self._design_matrix(boot[..., 0]), boot[..., 1])
+            for boot in self._iter_boot_blocks()
+        ])
+
+    def BCA(self):
+        '''
+        BCA method of aquiring confidence intervals
+        '''
+        return self._eval_BCA_columns(self.prelim_result, self._valid_boot_stats)
 
-__all__ = ['Stat', 'Fit']
+    def percentile(self):
+        '''
+        percentile method of aquiring confidence intervals
+        '''
+        return self._eval_percentile_columns(self._valid_boot_stats)
 
 
-class _bootstrapMixin(object):
+class GroupedStat(_bootstrapMixin):
     '''
-    Class for using bootstrap techniques to estimate a statistic and its
-        confidence intervals.
+    Bootstrap a statistic of many groups of data of different sizes at
+        once. Each group is resampled within itself exactly like `Stat`
+        with storage='index' would, and the statistics and confidence
+        intervals of every group are computed in vectorized passes. The
+        groups are drawn and reduced in blocks of about
+        `_GROUP_BLOCK_BYTES`, so memory use doesn't grow with the total
+        number of values.
 
     Parameters
     ----------
-    inputdata : array-like
-        The data that we're describing
-    statfxn : optional function or lambda (default is numpy.median)
-        Function that takes `inputdata` as the sole argument and return
-        a single float value.
+    values : array-like
+        The data of all of the groups, one group after another
+    offsets : array-like of ints
+        The (G + 1) boundaries of the groups in `values`, i.e., group
+        `g` is `values[offsets[g]:offsets[g+1]]`. Groups can't be empty.
+    statfxn : optional function (default is numpy.median)
+        Statistic computed for each group (see `Stat`)
     alpha : optional float (default = 0.05)
-        The uncertainty level e.g., for 95% confidence intervals,
-        `alpha` = 0.05
+        The uncertainty level of the confidence intervals
     NIter : optional int (default = 5000)
         The number of interation to use in the bootstrapping routine
+    engine : optional string (default = 'vectorized')
+        How the resampled indices are drawn (see `make_boot_index`)
+    seed : optional seed, or sequence of G seeds, or None (default)
+        A single seed (see `Stat`) is used to draw the groups one after
+        the other. With a sequence, each group is drawn from its own
+        seed, such that each group gets the same resamples as
+        `Stat(values[offsets[g]:offsets[g+1]], seed=seed[g])`.
 
-    Attributes
-    ----------
-    data : numpy array
-        Array of the data that we're describing
-    statfxn : function or lambda
-        Function that takes `inputdata` as the sole argument and return
-        a single float value.
-    alpha : float
-        The uncertainty level of the confidence intervals
-    NIter : int
-        The number of interation used in the bootstrapping routine
-    prelim_result : float
-        Estimate of the statistic based on the original dataset
+    '''
+    def __init__(self, values, offsets, statfxn=np.median, alpha=0.05,
+                 NIter=5000, engine='vectorized', seed=None):
+        self.data = np.asarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        if (self.offsets.ndim != 1 or self.offsets.shape[0] < 2 or
+                self.offsets[0] != 0 or self.offsets[-1] != self.data.shape[0] or
+                np.any(np.diff(self.offsets) < 1)):
+            raise ValueError("`offsets` must increase from 0 to the number "
+                             "of values with no empty groups")
 
-    Methods (see individual docstrings):
-    -----------------------------------
-    _setup
-    BCA
-    percentile
+        self.statfxn = statfxn
+        self.alpha = alpha
+        self.NIter = NIter
+        self.engine = engine
+        self.seed = seed
+        self._make_resamples()
+        self._setup()
 
-    '''
-    def _acceleration(self):
+    @property
+    def starts(self):
+        return self.offsets[:-1]
+
+    @property
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def _make_resamples(self):
         '''
-        Compute the acceleration statistic
+        Set up the random state of each group. The resamples themselves
+            are drawn block by block in `_setup`.
 
         Input:
             None
 
         Writes:
-            None
+            _random_states
 
         Returns:
-            acc (float) : the acceleration statistic
+            None
         '''
-        # intermediate values
-        SSD = np.sum((self.data.mean() - self.data)**3)
-        SCD = np.sum((self.data.mean() - self.data)**2)
-
-        # dodge the ZeroDivision error
-        if SCD == 0:
-            SCD = 1e-12
-
-        # comput and return the acceleration
-        acc = SSD / (6 * SCD**1.5)
-        return acc
+        G = self.sizes.shape[0]
+        if isinstance(self.seed, (list, tuple)):
+            if len(self.seed) != G:
+                raise ValueError("`seed` must be a single seed or one per group")
+            self._random_states = [_check_random_state(seed) for seed in self.seed]
+        else:
+            self._random_states = [_check_random_state(self.seed)] * G
 
-    def _make_bootstrap_array(self):
+    def _group_blocks(self):
         '''
-        Generate an array of bootstrap sample sets
+        Split the groups into blocks of consecutive groups whose
+            (NIter, n) array of resampled values fits in
+            `_GROUP_BLOCK_BYTES`. A group that's too large on its own
+            gets its own block.
 
         Input:
             None
@@ -82,138 +1948,308 @@ class _bootstrapMixin(object):
             None
 
         Returns:
-            bootArray (nump array of floats) : a collection of random samples
-                pulled from the the dataset
+            blocks (list of (first, last) tuples) : the groups
+                `first` to `last - 1` of each block
         '''
+        max_cols = max(1, _GROUP_BLOCK_BYTES // (self.NIter * 8))
+        blocks, first, cols = [], 0, 0
+        for g, size in enumerate(self.sizes):
+            if g > first and cols + size > max_cols:
+                blocks.append((first, g))
+                first, cols = g, 0
+            cols += size
+        blocks.append((first, self.sizes.shape[0]))
+        return blocks
 
-        # stack the data together if we're
-        # bootstrapping a curve fig
-        if hasattr(self, 'outputdata'):
-            data = np.vstack([self.data, self.outputdata]).T
+    def _iter_resample_blocks(self, first, last, lookup):
+        '''
+        Draw the resamples of a block of groups, one group after the
+            other, in blocks of rows. Only a block of a single group is
+            drawn in more than one block of rows, so the groups that
+            share a random state get the same draws as `Stat`.
+
+        Input:
+            first, last (ints) : the groups `first` to `last - 1`
+            lookup (numpy array) : the value of each data point of the
+                block of groups that is resampled (e.g., the data or
+                their ranks)
+
+        Writes:
+            None
+
+        Returns:
+            resamples (generator of numpy arrays) : blocks of rows of
+                the resampled values of `lookup`
+        '''
+        starts = self.starts[first:last] - self.starts[first]
+        sizes = self.sizes[first:last]
+        N = lookup.shape[0]
+        if last - first == 1:
+            rows = max(1, _GROUP_BLOCK_BYTES // (N * 8))
         else:
-            data = self.data
+            rows = self.NIter
 
-        # number of data points
-        N = data.shape[0]
+        for start in range(0, self.NIter, rows):
+            stop = min(start + rows, self.NIter)
+            resamples = np.empty((stop - start, N), dtype=lookup.dtype)
+            for g, col, size in zip(range(first, last), starts, sizes):
+                index = make_boot_index(size, stop - start, engine=self.engine,
+                                        random_state=self._random_states[g])
+                resamples[:, col:col + size] = lookup[col:col + size][index]
+            yield resamples
+
+    @property
+    def _quantile(self):
+        '''
+        The percentile (0 - 100) computed by `statfxn`, if it's the
+            median or a `Percentile`, otherwise None
+        '''
+        if self.statfxn is np.median:
+            return 50.0
+        elif isinstance(self.statfxn, Percentile):
+            return self.statfxn.q
 
-        # shape of the output array
-        shape = [self.NIter]
-        shape.extend(data.shape)
+    def _setup(self):
+        '''
+        Utility method to setup the preliminary results and the
+            bootstrapped statistics (one column per group). The groups
+            are resampled and reduced in blocks so that the memory used
+            is bounded no matter the total number of values.
+        '''
+        self.prelim_result = np.array([
+            self.statfxn(self.data[start:stop])
+            for start, stop in zip(self.offsets[:-1], self.offsets[1:])
+        ])
 
-        # create the output array
-        bootArray = np.empty(shape, dtype=np.float64)
+        self._boot_stats = np.empty((self.NIter, self.sizes.shape[0]))
+        for first, last in self._group_blocks():
+            data = self.data[self.offsets[first]:self.offsets[last]]
+            starts = self.starts[first:last] - self.starts[first]
+            sizes = self.sizes[first:last]
 
-        # stuff a random samples (with replacement)
-        # into the each row of the output array
-        for n in range(self.NIter):
-            index = np.random.random_integers(low=0, high=N-1, size=N)
-            bootArray[n] = data[index]
+            # percentiles are found from the ranks of the resampled values
+            if self._quantile is not None:
+                ranks, sorted_data = _group_ranks(data, starts, sizes)
+                lookup = ranks
+            else:
+                lookup = data
 
-        # we're done
-        return bootArray
+            row = 0
+            for resamples in self._iter_resample_blocks(first, last, lookup):
+                if self._quantile is not None:
+                    stats = _percentile_of_groups(sorted_data, resamples,
+                                                  starts, sizes, self._quantile)
+                else:
+                    stats = self._grouped_stats(resamples, starts, sizes)
 
-    def _eval_BCA(self, prelim_result, boot_stats):
+                self._boot_stats[row:row + resamples.shape[0], first:last] = stats
+                row += resamples.shape[0]
+
+    def _grouped_stats(self, boot, starts, sizes):
         '''
-        Evaluate the BCA method of aquiring confidence intervals around a
-            statistic
+        Compute the statistic of every group of a block of resamples
 
         Input:
-            prelim_result (float) : estimate of the statistic computed from the
-                full dataset
-            boot_stats (numpy array of floats) : estimates of the statistic
-                computed from iteratively resampling the dataset
+            boot (numpy array of floats) : (rows, N) array of the
+                resampled data of a block of groups
+            starts, sizes (numpy arrays of ints) : the first column and
+                the size of each group in `boot`
 
         Writes:
             None
 
         Returns:
-            result (float) : refined(?) estimate of the statistic
-            CI (numpy array of floats) : confidence intervals of statistic
+            boot_stats (numpy array of floats) : (rows, G) array of the
+                statistic of each group of each resample
+        '''
+        for statfxn, grouped_fxn in _GROUPED_STATS:
+            if self.statfxn is statfxn:
+                return grouped_fxn(boot, starts, sizes)
 
-        TODO: fallback to percentile method should raise a warning
+        return np.column_stack([
+            self.statfxn(boot[:, start:start + size], axis=1)
+            for start, size in zip(starts, sizes)
+        ])
+
+    def _acceleration(self):
+        '''
+        Compute the acceleration statistic of each group
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            acc (numpy array of floats) : the acceleration statistics
+        '''
+        mean = _grouped_mean(self.data[None, :], self.starts, self.sizes)[0]
+        deviations = np.repeat(mean, self.sizes) - self.data
+        return _skew_acceleration(deviations, self.starts)
+
+    def BCA(self):
         '''
+        BCA method of aquiring confidence intervals
 
-        # number of results below the premlinary estimate
-        NumBelow = np.sum(boot_stats < prelim_result)
-        if NumBelow == 0:
-            NumBelow = 0.00001
+        Returns:
+            results (numpy array of floats) : estimate of each group's
+                statistic
+            CI (numpy array of floats) : (G, 2) array of the confidence
+                intervals of each group
+        '''
+        return self._eval_BCA_columns(self.prelim_result, self._boot_stats)
 
-        # compute the acceleration
-        a_hat = self._acceleration()
+    def percentile(self):
+        '''
+        percentile method of aquiring confidence intervals
+        '''
+        return self._eval_percentile_columns(self._boot_stats)
 
-        # z-stats on the % of `NumBelow` and the confidence limits
-        if NumBelow != self.NIter:
-            z0 = dist.norm.ppf(float(NumBelow)/self.NIter)
-            z1 = dist.norm.ppf(self.alpha/2.0)
-            z2 = dist.norm.ppf(1-self.alpha/2.0)
 
-            # refine the confidence limits (alphas)
-            z1Total = (z0 + (z0 + z1)) / (1 - a_hat*(z0+z1))
-            z2Total = (z0 + (z0 + z2)) / (1 - a_hat*(z0+z2))
-            alpha1 = dist.norm.cdf(z1Total)*100.0
-            alpha2 = dist.norm.cdf(z2Total)*100.0
+# contrasts between the statistics of two samples, (x, y) -> contrast
+_CONTRASTS = {
+    'difference': lambda x, y: x - y,
+    'ratio': lambda x, y: y / x,
+    'percent_removal': lambda x, y: 100.0 * (x - y) / x,
+}
 
-            # take the mean of the `boot_stats`
-            result = boot_stats.mean()
 
-            # confidence intervals from the new alphas
-            CI = np.array([stats.scoreatpercentile(boot_stats, alpha1),
-                          stats.scoreatpercentile(boot_stats, alpha2)])
+class TwoSampleStat(_bootstrapMixin):
+    '''
+    Bootstrap a contrast (e.g., the difference) between a statistic of
+        two samples, such as the influent and effluent concentrations of
+        a BMP.
 
-            # fall back to the standard percentile method if the results
-            # don't make any sense
-            if result < CI[0] or CI[1] < result:
-                result, CI = self._eval_percentile(boot_stats)
+    Parameters
+    ----------
+    x, y : array-like
+        The two samples. `x` is the reference (e.g., influent).
+    statfxn : optional function (default is numpy.median)
+        Statistic computed for each sample. Must accept an `axis`
+        keyword.
+    contrast : optional string or function (default = 'difference')
+        How the statistics of the samples are compared. 'difference' is
+        statfxn(x) - statfxn(y), 'ratio' is statfxn(y) / statfxn(x), and
+        'percent_removal' is 100 * (statfxn(x) - statfxn(y)) / statfxn(x).
+        Any vectorized function of the two statistics can also be used.
+    paired : optional bool (default = False)
+        When True, `x` and `y` must have the same length and pairs of
+        observations are resampled together. Otherwise, the two samples
+        are resampled independently.
+    alpha : optional float (default = 0.05)
+        The uncertainty level of the confidence intervals
+    NIter : optional int (default = 5000)
+        The number of interation to use in the bootstrapping routine
+    seed : optional int, numpy.random.Generator, or None (default)
+        Seed (or source) of the random draws (see `Stat`)
+
+    '''
+    def __init__(self, x, y, statfxn=np.median, contrast='difference',
+                 paired=False, alpha=0.05, NIter=5000, seed=None):
+        self.data = np.asarray(x, dtype=np.float64)
+        self.ydata = np.asarray(y, dtype=np.float64)
+        self.statfxn = statfxn
+        if callable(contrast):
+            self._contrast = contrast
+        elif contrast in _CONTRASTS:
+            self._contrast = _CONTRASTS[contrast]
         else:
-            result, CI = self._eval_percentile(boot_stats)
+            raise ValueError("`contrast` must be a function or one of "
+                             "{}".format(sorted(_CONTRASTS)))
 
-        return result, CI
+        self.contrast = contrast
+        self.paired = paired
+        if paired and self.data.shape != self.ydata.shape:
+            raise ValueError("paired samples must have the same length")
 
-    def _eval_percentile(self, boot_stats):
+        self.alpha = alpha
+        self.NIter = NIter
+        self.seed = seed
+        self._make_resamples()
+        self._setup()
+
+    def _make_resamples(self):
         '''
-        Evaluate the percentile method of aquiring confidence intervals around
-            a statistic
+        Draw the resampled indices of both samples in a single call to
+            the random number generator. With paired samples, the same
+            indices are used for both.
 
         Input:
-            boot_stats (numpy array of floats) : estimates of the statistic
-                computed from iteratively resampling the dataset
+            None
 
         Writes:
-            None
+            _boot_index : (NIter, N) array of resampled indices if
+                `paired`, otherwise a (NIter, Nx + Ny) array whose first
+                Nx columns index `x` and the rest index `y`
 
         Returns:
-            result (float) : refined(?) estimate of the statistic
-            CI (numpy array of floats) : confidence intervals of statistic
+            None
         '''
-        # compute the `alpha/2` and `1-alpha/2` percentiles of `boot_stats`
-        CI = np.array([
-            np.percentile(boot_stats, self.alpha*50, axis=0),
-            np.percentile(boot_stats, 100-self.alpha*50, axis=0),
-        ])
+        random_state = _check_random_state(self.seed)
+        Nx, Ny = self.data.shape[0], self.ydata.shape[0]
+        if self.paired:
+            high, size = Nx, (self.NIter, Nx)
+        else:
+            # the upper bound of each column is the size of its sample
+            high, size = np.repeat([Nx, Ny], [Nx, Ny]), (self.NIter, Nx + Ny)
 
-        # median of `boot_stats`
-        result = np.percentile(boot_stats, 50, axis=0)
+        index = _randint(random_state, high, size)
+        self._boot_index = index.astype(_index_dtype(max(Nx, Ny)))
 
-        return result, CI
+    def _setup(self):
+        '''
+        Utility method to setup the preliminary result and the
+            bootstrapped contrasts
+        '''
+        self.prelim_result = self._contrast(self.statfxn(self.data),
+                                            self.statfxn(self.ydata))
 
+        Nx = self.data.shape[0]
+        rows = _block_rows(self._boot_index.shape[1] * 8)
+        boot_stats = []
+        for start in range(0, self.NIter, rows):
+            index = self._boot_index[start:start + rows]
+            if self.paired:
+                x_index, y_index = index, index
+            else:
+                x_index, y_index = index[:, :Nx], index[:, Nx:]
 
-class Stat(_bootstrapMixin):
+            boot_stats.append(self._contrast(
+                self.statfxn(self.data[x_index], axis=1),
+                self.statfxn(self.ydata[y_index], axis=1),
+            ))
 
-    def __init__(self, inputdata, statfxn=np.median, alpha=0.05, NIter=5000):
-        self.data = inputdata
-        self.statfxn = statfxn
-        self.alpha = alpha
-        self.NIter = NIter
-        self._boot_array = self._make_bootstrap_array()
-        self._setup()
+        self._boot_stats = np.concatenate(boot_stats)
 
-    def _setup(self):
+    def _acceleration(self):
         '''
-        Utility method to setup the _bootstrapMixin object's attributes of the
-            preliminary results and the boot strapped
+        Compute the acceleration statistic from the jackknife estimates
+            of the contrast (leaving out one pair at a time, or one
+            observation of each sample in turn)
+
+        Input:
+            None
+
+        Writes:
+            None
+
+        Returns:
+            acc (float) : the acceleration statistic
         '''
-        self.prelim_result = self.statfxn(self.data)
-        self._boot_stats = self.statfxn(self._boot_array, axis=1)
+        jack_x = _jackknife(self.data, self.statfxn)
+        jack_y = _jackknife(self.ydata, self.statfxn)
+        if self.paired:
+            samples = [(self._contrast(jack_x, jack_y), 1)]
+        else:
+            stat_x, stat_y = self.statfxn(self.data), self.statfxn(self.ydata)
+            samples = [(self._contrast(jack_x, stat_y), jack_x.shape[0]),
+                       (self._contrast(stat_x, jack_y), jack_y.shape[0])]
+
+        # influence of each observation, scaled by its sample's size
+        deviations = np.hstack([(jack_stats.mean() - jack_stats) / N
+                                for jack_stats, N in samples])
+        return _skew_acceleration(deviations)
 
     def BCA(self):
         '''
@@ -228,67 +2264,201 @@ class Stat(_bootstrapMixin):
         return self._eval_percentile(self._boot_stats)
 
 
-class Fit(_bootstrapMixin):
-    def __init__(self, inputdata, outputdata, curvefitfxn,
-                 statfxn=opt.curve_fit, alpha=0.05, NIter=5000):
-        self.data = np.array(inputdata, dtype=np.float64)
-        self.outputdata = np.array(outputdata, dtype=np.float64)
-        self.curvefitfxn = curvefitfxn
+class CensoredStat(_bootstrapMixin):
+    '''
+    Bootstrap a statistic of censored data. The (result, qualifier)
+        pairs are resampled and the non-detects of every resample are
+        estimated again with ROS (see `ros.MR`), so the confidence
+        intervals reflect the uncertainty of the estimates. The
+        resamples are estimated in batches with `ros.ros_grouped`.
+
+    Parameters
+    ----------
+    values : array-like
+        The results. Non-detects should be set to their detection
+        limit.
+    censored : array-like of bools
+        True for the non-detects
+    statfxn : optional function (default is numpy.median)
+        Statistic of the estimated data. Must accept an `axis` keyword.
+    alpha : optional float (default = 0.05)
+        The uncertainty level of the confidence intervals
+    NIter : optional int (default = 5000)
+        The number of interation to use in the bootstrapping routine
+    boot_index : optional array of ints or None (default)
+        A precomputed (NIter, N) array of resampled indices (see
+        `make_boot_index`)
+    seed : optional int, numpy.random.Generator, or None (default)
+        Seed (or source) of the random draws (see `Stat`)
+    fitlogs : optional bool (default = True)
+        Fit the ROS regressions to the logs of the detects
+    dist : optional string or distribution (default = 'norm')
+        Distribution of the ROS plotting positions
+
+    '''
+    def __init__(self, values, censored, statfxn=np.median, alpha=0.05,
+                 NIter=5000, boot_index=None, seed=None, fitlogs=True,
+                 dist='norm'):
+        self.data = np.asarray(values, dtype=np.float64)
+        self.censored = np.asarray(censored, dtype=bool)
+        if self.data.shape != self.censored.shape or self.data.ndim != 1:
+            raise ValueError("`values` and `censored` must be 1-D arrays of "
+                             "the same length")
+
         self.statfxn = statfxn
         self.alpha = alpha
-        self.NIter = NIter
-        self._boot_array = self._make_bootstrap_array()
+        self.boot_index = boot_index
+        self.NIter = NIter if boot_index is None else np.shape(boot_index)[0]
+        self.engine = 'vectorized'
+        self.seed = seed
+        self.fitlogs = fitlogs
+        self.dist = dist
+        self._make_resamples()
         self._setup()
 
+    def _make_resamples(self):
+        '''
+        Draw (or validate) the resampled indices
+
+        Input:
+            None
+
+        Writes:
+            _boot_index : (NIter, N) array of resampled indices
+
+        Returns:
+            None
+        '''
+        self._random_state = _check_random_state(self.seed)
+        N = self.data.shape[0]
+        self._boot_index = self._make_boot_index(N, dtype=_index_dtype(N))
+
+    def _estimate(self, index):
+        '''
+        ROS estimates of the data of each row of an array of indices
+
+        Input:
+            index (numpy array of ints) : (k, n) array of indices into
+                the data
+
+        Writes:
+            None
+
+        Returns:
+            final (numpy array of floats) : (k, n) array of the detects
+                and the estimated non-detects of each row
+        '''
+        k, n = index.shape
+        groups = np.repeat(np.arange(k), n)
+        final = ros.ros_grouped(self.data[index].ravel(),
+                                self.censored[index].ravel(), groups,
+                                fitlogs=self.fitlogs, dist=self.dist)
+        return final.reshape(k, n)
+
     def _setup(self):
         '''
-        Utility method to setup the _boot_strap object's attributes of the
-            preliminary results and the boot strapped
+        Utility method to setup the preliminary result and the
+            bootstrapped statistics
         '''
-        # prelim results
-        self.prelim_result, pcov = self.statfxn(self.curvefitfxn,
-                                                self.data,
-                                                self.outputdata)
+        N = self.data.shape[0]
+        self.final_data = ros.ros_estimate(self.data, self.censored,
+                                           fitlogs=self.fitlogs,
+                                           dist=self.dist)
+        self.prelim_result = self.statfxn(self.final_data)
+
+        rows = _block_rows(N * 8)
+        boot_stats = []
+        for start in range(0, self.NIter, rows):
+            final = self._estimate(self._boot_index[start:start + rows])
+            boot_stats.append(self.statfxn(final, axis=1))
+
+        self._boot_stats = np.concatenate(boot_stats)
+
+    def _acceleration(self):
+        '''
+        Compute the acceleration statistic from the skewness of the
+            estimated data (see `Stat`)
 
-        # setup bootstrap stats array
-        self._boot_stats = np.empty([self.NIter, self.prelim_result.shape[0]])
+        Input:
+            None
+
+        Writes:
+            None
 
-        # fill in the results
-        for r, boot in enumerate(self._boot_array):
-            fitparams, covariance = self.statfxn(self.curvefitfxn,
-                                                 boot[:, 0], boot[:, 1])
-            self._boot_stats[r] = fitparams
+        Returns:
+            acc (float) : the acceleration statistic
+        '''
+        return _skew_acceleration(self.final_data.mean() - self.final_data)
 
     def BCA(self):
         '''
         BCA method of aquiring confidence intervals
         '''
-        # empty arrays of results and CIs for each
-        # fit parameter
-        results = np.empty(self.prelim_result.shape[0])
-        CI = np.empty([self.prelim_result.shape[0], 2])
-
-        # use BCA to estimate each parameter
-        for n, param in enumerate(self.prelim_result):
-            res, ci = self._eval_BCA(param, self._boot_stats[:, n])
-            results[n] = res
-            CI[n] = ci
-
-        return results, CI
+        return self._eval_BCA(self.prelim_result, self._boot_stats)
 
     def percentile(self):
         '''
         percentile method of aquiring confidence intervals
         '''
-        # empty arrays of results and CIs for each
-        # fit parameter
-        results = np.empty([self._boot_stats.shape[1]])
-        CI = np.empty([self._boot_stats.shape[1], 2])
+        return self._eval_percentile(self._boot_stats)
 
-        # use percentiles to estimate each parameter
-        for n, bstat in enumerate(self._boot_stats.T):
-            res, ci = self._eval_percentile(bstat)
-            results[n] = res
-            CI[n] = ci
 
-        return results, CI
+def grouped_BCA(groups, statfxn=np.median, alpha=0.05, NIter=5000, seeds=None):
+    '''
+    BCA confidence intervals of a statistic of many groups of data.
+    Statistics with a vectorized grouped reduction (e.g., the mean) are
+    bootstrapped together with `GroupedStat`; any other statistic (e.g.,
+    the median) isn't any faster that way, so each group gets its own
+    `Stat`. Groups whose results are in the on-disk cache (see
+    `set_cache`) aren't bootstrapped again.
+
+    Input:
+        groups (list of array-likes) : the data of each group
+        statfxn (function, optional) : the statistic (see `Stat`)
+        alpha (float, optional) : the uncertainty level
+        NIter (int, optional) : number of bootstrap iterations
+        seeds (list, optional) : seed of each group (see
+            `GroupedStat`). None uses the global numpy random state.
+
+    Writes:
+        None
+
+    Returns:
+        results (numpy array of floats) : estimate of each group's
+            statistic
+        CI (numpy array of floats) : (G, 2) array of the confidence
+            intervals of each group
+    '''
+    groups = [np.asarray(group, dtype=np.float64) for group in groups]
+    if seeds is None:
+        seeds = [None] * len(groups)
+
+    cache = get_cache()
+    keys = [None] * len(groups)
+    if cache is not None:
+        keys = [cache.key(group, statfxn, NIter, alpha, 'BCA', seed)
+                for group, seed in zip(groups, seeds)]
+
+    values = [None if key is None else cache.get(key) for key in keys]
+    missing = [n for n, value in enumerate(values) if value is None]
+    if missing and any(statfxn is fxn for fxn, _ in _GROUPED_STATS):
+        offsets = np.cumsum([0] + [groups[n].shape[0] for n in missing])
+        bs = GroupedStat(np.concatenate([groups[n] for n in missing]), offsets,
+                         statfxn=statfxn, alpha=alpha, NIter=NIter,
+                         seed=[seeds[n] for n in missing])
+        computed = zip(*bs.BCA())
+    else:
+        computed = (
+            Stat(groups[n], statfxn=statfxn, alpha=alpha, NIter=NIter,
+                 seed=seeds[n], storage='index').BCA()
+            for n in missing
+        )
+
+    for n, (res, CI) in zip(missing, computed):
+        values[n] = (res, CI)
+        if keys[n] is not None:
+            cache.put(keys[n], values[n])
+
+    results = np.array([res for res, CI in values])
+    CI = np.array([CI for res, CI in values]).reshape(-1, 2)
+    return results, CI
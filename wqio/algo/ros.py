@@ -15,7 +15,7 @@ import scipy.stats as stats
 import pandas
 
 
-__all__ = ['rosSort', 'MR']
+__all__ = ['rosSort', 'ros_estimate', 'ros_grouped', 'MR', 'IncrementalMR']
 
 
 def rosSort(dataframe, rescol='res', qualcol='qual', ndsymbol='ND'):
@@ -51,6 +51,359 @@ def rosSort(dataframe, rescol='res', qualcol='qual', ndsymbol='ND'):
     return ros_data #.reset_index(drop=True)
 
 
+def _cohn_counts(detects, nondetects, lower, upper):
+    '''
+    Counts the results around each detection limit with binary searches
+    of the sorted detects and non-detects.
+
+    Input:
+        detects : array of the detected results
+        nondetects : array of the non-detect results (i.e., the DLs)
+        lower, upper : arrays of the lower and upper bounds of each
+            detection limit's interval
+
+    Output:
+        A : number of detects in [lower, upper)
+        B : number of non-detects <= lower plus detects < lower
+        C : number of non-detects equal to lower
+    '''
+    detects = np.sort(detects)
+    nondetects = np.sort(nondetects)
+
+    detects_below = np.searchsorted(detects, lower, side='left')
+    nondets_below = np.searchsorted(nondetects, lower, side='left')
+    nondets_upto = np.searchsorted(nondetects, lower, side='right')
+
+    A = np.searchsorted(detects, upper, side='left') - detects_below
+    B = nondets_upto + detects_below
+    C = nondets_upto - nondets_below
+    return A, B, C
+
+
+def _ros_ranks(res, DLIndex, censored):
+    '''
+    Computes the normal and averaged ranks of data sorted as by
+    `rosSort` (see `MR._ros_ranks` for the logic). The normal ranks
+    count up within each run of consecutive values that share the same
+    detection limit index and censoring. The averaged ranks are the mean
+    normal rank of each set of equal detected values with the same
+    detection limit index, which are consecutive in sorted data.
+
+    Input:
+        res : array of the sorted results
+        DLIndex : array of the detection limit index of each result
+        censored : boolean array, True for the non-detects
+
+    Output:
+        norm_ranks, avg_ranks : arrays of floats
+    '''
+    N = res.shape[0]
+    if N == 0:
+        return np.empty(0), np.empty(0)
+
+    position = np.arange(N)
+    new_run = np.ones(N, dtype=bool)
+    new_run[1:] = (DLIndex[1:] != DLIndex[:-1]) | (censored[1:] != censored[:-1])
+
+    run_start = np.maximum.accumulate(np.where(new_run, position, 0))
+    norm_ranks = (position - run_start + 1).astype(np.float64)
+
+    # non-detects are never averaged with their neighbors
+    new_tie = new_run | censored
+    new_tie[1:] |= res[1:] != res[:-1]
+    starts = np.flatnonzero(new_tie)
+    counts = np.diff(np.append(starts, N))
+    avg_ranks = np.repeat(np.add.reduceat(norm_ranks, starts) / counts, counts)
+
+    return norm_ranks, avg_ranks
+
+
+def _ros_DL_bounds(values, censored):
+    '''
+    Unique detection limits of sorted data and the bounds of their
+    intervals. The smallest result is added as a detection limit if it's
+    below all of the others.
+
+    Input:
+        values : array of the results
+        censored : boolean array, True for the non-detects
+
+    Output:
+        lower, upper : arrays of the bounds of each detection limit's
+            interval (`lower` is the detection limit itself)
+    '''
+    DLs = np.unique(values[censored])
+    if DLs.shape[0] > 0 and values.min() < DLs[0]:
+        DLs = np.hstack([values.min(), DLs])
+
+    upper = np.append(DLs[1:], np.inf)
+    return DLs, upper
+
+
+def _ros_PE(A, B):
+    '''
+    Exceedance probabilities of each detection limit (with a trailing
+    zero for the space above the highest one)
+    '''
+    PE = np.zeros(A.shape[0] + 1)
+    for j in range(A.shape[0] - 1, -1, -1):
+        PE[j] = PE[j+1] + A[j] / (A[j] + B[j]) * (1 - PE[j+1])
+    return PE
+
+
+def _ros_sorted(res, nondet, fitlogs=True, dist='norm'):
+    '''
+    The MR estimation of data that are already sorted as by `rosSort`
+    (non-detects first, then detects, each ascending). See
+    `ros_estimate`.
+
+    Output:
+        final, plot_pos, Z : arrays in the order of `res`
+    '''
+    N_tot = res.shape[0]
+    N_nd = nondet.sum()
+    plot_pos = np.full(N_tot, np.nan)
+    Z = np.full(N_tot, np.nan)
+
+    if N_nd == 0:
+        final = res.copy()
+
+    elif N_tot - N_nd < 2 or N_nd / N_tot > 0.8:
+        final = np.where(nondet, 0.5 * res, res)
+
+    else:
+        lower, upper = _ros_DL_bounds(res, nondet)
+        A, B, C = _cohn_counts(res[~nondet], res[nondet], lower, upper)
+        PE = _ros_PE(A, B)
+
+        # index of the highest DL at or below each result
+        DLIndex = np.searchsorted(lower, res, side='right') - 1
+        norm_ranks, avg_ranks = _ros_ranks(res, DLIndex, nondet)
+
+        plot_pos = np.where(
+            nondet,
+            (1 - PE[DLIndex]) * norm_ranks / (C[DLIndex] + 1),
+            (1 - PE[DLIndex]) + (PE[DLIndex] - PE[DLIndex + 1]) *
+                norm_ranks / (A[DLIndex] + 1)
+        )
+
+        if isinstance(dist, str):
+            dist = getattr(stats, dist)
+        Z = dist.ppf(plot_pos)
+
+        detect_vals = res[~nondet]
+        if fitlogs:
+            detect_vals = np.log(detect_vals)
+        slope, intercept = stats.linregress(Z[~nondet], detect_vals)[:2]
+
+        final = np.where(nondet, np.exp(slope * Z + intercept), res)
+
+    return final, plot_pos, Z
+
+
+def ros_estimate(values, censored, fitlogs=True, dist='norm',
+                 full_output=False):
+    '''
+    Estimates the censored values of a dataset with the MR method (see
+    `MR`) using only NumPy arrays.
+
+    Input:
+        values : array of the results. Non-detects should be set to
+            their detection limit. Must all be positive.
+        censored : boolean array, True for the non-detects
+        fitlogs (default = True) : fit the regression to the logs of
+            the detects
+        dist (default = 'norm') : name of a distribution in
+            `scipy.stats` (or the distribution itself) used to compute
+            the Z-scores of the plotting positions
+        full_output (default = False) : also return the plotting
+            positions and Z-scores
+
+    Output:
+        final : array of the detects and the estimated non-detects, in
+            the order of `values`. Equal non-detects are estimated in
+            the order they appear.
+        plot_pos, Z (only if `full_output`) : arrays of the plotting
+            positions and Z-scores (NaN when the regression isn't used)
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    censored = np.asarray(censored, dtype=bool)
+    if values.shape != censored.shape or values.ndim != 1:
+        raise ValueError("`values` and `censored` must be 1-D arrays of the "
+                         "same length")
+
+    if values.shape[0] > 0 and values.min() <= 0:
+        raise ValueError('All result values must be positive')
+
+    order = np.lexsort((values, ~censored))
+    res, nondet = values[order], censored[order]
+
+    final = np.empty(values.shape[0])
+    plot_pos = np.empty(values.shape[0])
+    Z = np.empty(values.shape[0])
+    final[order], plot_pos[order], Z[order] = _ros_sorted(res, nondet, fitlogs,
+                                                          dist)
+
+    if full_output:
+        return final, plot_pos, Z
+    else:
+        return final
+
+
+def ros_grouped(values, censored, groups, fitlogs=True, dist='norm'):
+    '''
+    Estimates the censored values of many groups of data at once with
+    the MR method. Gives the same results as calling `ros_estimate` on
+    each group, but the whole dataset is sorted once and the detection
+    limit tables, ranks, plotting positions, and regressions of every
+    group are computed in vectorized passes.
+
+    Input:
+        values : array of the results. Non-detects should be set to
+            their detection limit. Must all be positive.
+        censored : boolean array, True for the non-detects
+        groups : array of integer codes of the group of each result
+            (e.g., from `pandas.factorize`)
+        fitlogs (default = True) : fit the regressions to the logs of
+            the detects
+        dist (default = 'norm') : name of a distribution in
+            `scipy.stats` (or the distribution itself)
+
+    Output:
+        final : array of the detects and the estimated non-detects, in
+            the order of `values`
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    censored = np.asarray(censored, dtype=bool)
+    groups = np.asarray(groups, dtype=np.int64)
+    if not (values.shape == censored.shape == groups.shape) or values.ndim != 1:
+        raise ValueError("`values`, `censored`, and `groups` must be 1-D "
+                         "arrays of the same length")
+
+    if values.shape[0] > 0 and values.min() <= 0:
+        raise ValueError('All result values must be positive')
+
+    if isinstance(dist, str):
+        dist = getattr(stats, dist)
+
+    # sort by group, with the sorted non-detects of each group first
+    order = np.lexsort((values, ~censored, groups))
+    res, nondet, group = values[order], censored[order], groups[order]
+    final = res.copy()
+
+    # pick the estimation method of each group (see `MR.estimator`)
+    G = group.max() + 1 if group.shape[0] > 0 else 0
+    N_tot = np.bincount(group, minlength=G)
+    N_nd = np.bincount(group, weights=nondet, minlength=G)
+    half_DLs = (N_nd > 0) & ((N_tot - N_nd < 2) | (N_nd > 0.8 * N_tot))
+    use_ros = (N_nd > 0) & ~half_DLs
+
+    final[nondet & half_DLs[group]] *= 0.5
+
+    rows = use_ros[group]
+    if rows.any():
+        final[rows] = _ros_sorted_groups(res[rows], nondet[rows], group[rows],
+                                         fitlogs, dist)
+
+    estimates = np.empty_like(final)
+    estimates[order] = final
+    return estimates
+
+
+def _ros_sorted_groups(res, nondet, group, fitlogs, dist):
+    '''
+    The MR estimates of groups of data that are sorted by group, with
+    the sorted non-detects of each group first, and that all need the
+    regression (see `ros_grouped`)
+    '''
+    # renumber the groups consecutively
+    group = np.unique(group, return_inverse=True)[1].ravel()
+    G = group.max() + 1
+    N = res.shape[0]
+    first = np.ones(N, dtype=bool)
+    first[1:] = group[1:] != group[:-1]
+
+    # the unique non-detects of each group are its detection limits.
+    # the smallest result of a group is added if it's below all of them
+    new_DL = nondet & (first | (res != np.roll(res, 1)))
+    starts = np.flatnonzero(first)
+    group_min = np.minimum.reduceat(res, starts)
+    extra = group_min < res[starts]
+
+    DL_group = np.append(group[new_DL], group[starts][extra])
+    lower = np.append(res[new_DL], group_min[extra])
+    DL_order = np.lexsort((lower, DL_group))
+    DL_group, lower = DL_group[DL_order], lower[DL_order]
+
+    last_DL = np.ones(lower.shape[0], dtype=bool)
+    last_DL[:-1] = DL_group[1:] != DL_group[:-1]
+    upper = np.where(last_DL, np.inf, np.append(lower[1:], np.inf))
+
+    # encode (group, value) pairs as sortable integers using the rank
+    # of each value among all values
+    unique_values = np.unique(res)
+    width = unique_values.shape[0] + 1
+
+    def key(group, values):
+        ranks = np.searchsorted(unique_values, values)
+        ranks = np.where(np.isinf(values), width - 1, ranks)
+        return group * width + ranks
+
+    detect_keys = key(group[~nondet], res[~nondet])
+    nondet_keys = key(group[nondet], res[nondet])
+    lower_keys = key(DL_group, lower)
+    upper_keys = key(DL_group, upper)
+    group_keys = DL_group * width
+
+    detects_below = np.searchsorted(detect_keys, lower_keys, side='left')
+    nondets_upto = np.searchsorted(nondet_keys, lower_keys, side='right')
+    A = np.searchsorted(detect_keys, upper_keys, side='left') - detects_below
+    B = (nondets_upto - np.searchsorted(nondet_keys, group_keys, side='left') +
+         detects_below - np.searchsorted(detect_keys, group_keys, side='left'))
+    C = nondets_upto - np.searchsorted(nondet_keys, lower_keys, side='left')
+
+    # exceedance probabilities, from the highest DL of each group down
+    DL_first = np.ones(lower.shape[0], dtype=bool)
+    DL_first[1:] = last_DL[:-1]
+    DL_starts = np.flatnonzero(DL_first)
+    DL_counts = np.diff(np.append(DL_starts, lower.shape[0]))
+    from_top = np.repeat(DL_starts + DL_counts - 1, DL_counts) - np.arange(lower.shape[0])
+
+    PE = np.zeros(lower.shape[0])
+    PE_next = np.zeros(lower.shape[0])
+    for level in range(DL_counts.max()):
+        j = np.flatnonzero(from_top == level)
+        if level > 0:
+            PE_next[j] = PE[j + 1]
+        PE[j] = PE_next[j] + A[j] / (A[j] + B[j]) * (1 - PE_next[j])
+
+    # ranks and plotting positions of the data
+    DLIndex = np.searchsorted(lower_keys, key(group, res), side='right') - 1
+    norm_ranks, avg_ranks = _ros_ranks(res, DLIndex, nondet)
+    plot_pos = np.where(
+        nondet,
+        (1 - PE[DLIndex]) * norm_ranks / (C[DLIndex] + 1),
+        (1 - PE[DLIndex]) + (PE[DLIndex] - PE_next[DLIndex]) *
+            norm_ranks / (A[DLIndex] + 1)
+    )
+    Z = dist.ppf(plot_pos)
+
+    # least-squares line through the detects of each group
+    x, y, g = Z[~nondet], res[~nondet], group[~nondet]
+    if fitlogs:
+        y = np.log(y)
+    n = np.bincount(g, minlength=G)
+    xmean = np.bincount(g, weights=x, minlength=G) / n
+    ymean = np.bincount(g, weights=y, minlength=G) / n
+    dx = x - xmean[g]
+    ssxm = np.bincount(g, weights=dx**2, minlength=G)
+    ssxym = np.bincount(g, weights=dx * (y - ymean[g]), minlength=G)
+    slope = ssxym / ssxm
+    intercept = ymean - slope * xmean
+
+    return np.where(nondet, np.exp(slope[group] * Z + intercept[group]), res)
+
+
 class MR(object):
     '''Regressiong on Order Statistics
     This class implements the MR method outlined Hirsch and Stedinger (1987)
@@ -101,7 +454,9 @@ class MR(object):
     debug : pandas DataFrame
         A full version of the `data` DataFrame that inlucdes other
         quantities computed during the estimation such as the "normal"
-        and "averaged" ranks and the preliminary Z-score
+        and "averaged" ranks and the preliminary Z-score. It's rebuilt
+        from the sorted results and qualifiers the first time it's
+        accessed, so other columns of the input aren't included.
 
 
     Examples
@@ -115,20 +470,6 @@ class MR(object):
     def __init__(self, data, rescol='res', qualcol='qual', ndsymbol='ND',
                  fitlogs=True, dist='norm'):
 
-        def _ros_DL_index(row):
-            '''
-            Helper function to create an array of indices for the detection
-            limits (self.DLs) corresponding to each data point
-            '''
-            DLIndex = np.zeros(len(self.data.res))
-            if self.DLs.shape[0] > 0:
-                index, = np.where(self.DLs['DL'] <= row['res'])
-                DLIndex = index[-1]
-            else:
-                DLIndex = 0
-
-            return DLIndex
-
         if not isinstance(data, pandas.DataFrame):
             raise ValueError("Input `data` must be a pandas.DataFrame")
 
@@ -138,105 +479,99 @@ class MR(object):
         if data[rescol].min() <= 0:
             raise ValueError('All result values of `data` must be positive')
 
-        # rename the dataframe columns to the standard names
-        # these will be used throughout ros.py when convenient
-        newdata = data.rename(columns={rescol: 'res', qualcol: 'qual'})
+        # and get the basic info
+        self.N_tot = data.shape[0]
+        self.N_nd = (data[qualcol] == ndsymbol).sum()
 
+        # keep the sorted results and qualifiers (not the input itself,
+        # which the caller may change) so that the debug frame can be
+        # rebuilt on demand
+        self._sort_input(data, rescol, qualcol, ndsymbol)
+        self._debug = None
+
+        self.fitlogs = fitlogs
+        if isinstance(dist, str):
+            self.dist = getattr(stats, dist)
+        else:
+            self.dist = dist
+
+        # estimate the NDs and select out only the necessary columns
+        self.data = self._estimate()[['final_data', 'res', 'qual']]
+
+    @property
+    def debug(self):
+        '''
+        A full version of the `data` DataFrame that includes the other
+        quantities computed during the estimation. Rebuilt from the
+        sorted results the first time it's accessed.
+        '''
+        if self._debug is None:
+            data = self.data
+            self._debug = self._estimate()
+            self.data = data
+        return self._debug
+
+    def _sort_input(self, data, rescol, qualcol, ndsymbol):
+        '''
+        Sorts the results of the input like `rosSort` (non-detects on
+        top, each part ascending) and stores them along with which ones
+        are non-detects and their index.
+        '''
         # confirm a datatype real quick
         try:
-            newdata.res = np.float64(newdata.res)
+            res = np.float64(data[rescol].values)
         except ValueError:
             raise ValueError('Result data is not uniformly numeric')
 
-        # and get the basic info
-        self.N_tot = newdata.shape[0]
-        self.N_nd = newdata[newdata.qual == ndsymbol].shape[0]
+        nondet = (data[qualcol] == ndsymbol).values
 
-        # clear out all of the non-ND quals
-        newdata['qual'] = newdata['qual'].apply(lambda x: 'ND' if x == ndsymbol else '=')
-        #newdata.qual[newdata.qual != ndsymbol] = '='
-        #newdata.qual[newdata.qual == ndsymbol] = 'ND'
+        # non-detects on top, each part sorted ascending
+        nd_rows, = np.where(nondet)
+        det_rows, = np.where(~nondet)
+        order = np.hstack([nd_rows[np.argsort(res[nd_rows])],
+                           det_rows[np.argsort(res[det_rows])]])
 
-        # sort the data
-        self.data = rosSort(newdata, rescol='res', qualcol='qual',
-                            ndsymbol=ndsymbol)
+        self._sorted_res = res[order]
+        self._sorted_nondet = nondet[order]
+        self._sorted_index = data.index[order]
 
-        self.fitlogs = fitlogs
-        if isinstance(dist, str):
-            self.dist = getattr(stats, dist)
-        else:
-            self.dist = dist
+    def _sorted_data(self):
+        '''
+        Builds the sorted working DataFrame of the estimation with the
+        results and the standardized qualifiers
+        '''
+        quals = np.where(self._sorted_nondet, 'ND', '=')
+        return pandas.DataFrame({'res': self._sorted_res, 'qual': quals},
+                                index=self._sorted_index,
+                                columns=['res', 'qual'])
+
+    def _estimate(self):
+        '''
+        Runs the estimation on the sorted data and returns the working
+        DataFrame with every intermediate column
+        '''
+        self.data = self._sorted_data()
 
         # create a dataframe of detection limits and their parameters
         # used in the ROS estimation
         self.DLs = self.cohn()
 
-        # create a DLIndex column that references self.DLs
-        self.data['DLIndex'] = self.data.apply(_ros_DL_index, axis=1)
+        # create a DLIndex column that references self.DLs (the index of
+        # the highest DL at or below each result)
+        DL = self.DLs['DL'].values[:-1]
+        DLIndex = np.searchsorted(DL, self.data['res'].values, side='right') - 1
+        self.data['DLIndex'] = np.maximum(DLIndex, 0)
 
         # compute the ranks of the data
         self._ros_ranks()
 
         # comput the plotting positions, z-scores, and final values
-        self.data = self.estimator()
-
-        # create the debug attribute as a copy of the self.data attribute
-        self.debug = self.data.copy(deep=True)
-
-        # select out only the necessary columns for data
-        self.data = self.data[['final_data', 'res', 'qual']]
+        return self.estimator()
 
     def cohn(self):
         '''
         Creates an array of unique detection limits in the dataset
         '''
-
-        def _A(row):
-            '''
-            Helper function to compute the `A` quantity.
-            '''
-            # index of results above the lower DL
-            above = self.data.res >= row['lower']
-
-            # index of results below the upper DL
-            below = self.data.res < row['upper']
-
-            # index of non-detect results
-            detect = self.data.qual != 'ND'
-
-            # return the number of results where all condictions are True
-            return self.data[above & below & detect].shape[0]
-
-        def _B(row):
-            '''
-            Helper function to compute the `B` quantity
-            '''
-            # index of data less than the lower DL
-            less_than = self.data.res < row['lower']
-
-            # index of data less than or equal to the lower DL
-            less_thanequal = self.data.res <= row['lower']
-
-            # index of detects, non-detects
-            detect = self.data.qual != 'ND'
-            nondet = self.data.qual == 'ND'
-
-            # number results less than or equal to lower DL and non-detect
-            LTE_nondets = self.data[less_thanequal & nondet].shape[0]
-
-            # number of results less than lower DL and detected
-            LT_detects = self.data[less_than & detect].shape[0]
-
-            # return the sum
-            return LTE_nondets + LT_detects
-
-        def _C(row):
-            '''
-            Helper function to compute the `C` quantity
-            '''
-            censored_below = self.data.res[self.data.qual == 'ND'] == row['lower']
-            return censored_below.sum()
-
         # unique values
         DLs = pandas.unique(self.data.res[self.data.qual == 'ND'])
 
@@ -260,9 +595,13 @@ class MR(object):
                 DLs['upper'] = np.inf
 
             # compute A, B, and C
-            DLs['A'] = DLs.apply(_A, axis=1)
-            DLs['B'] = DLs.apply(_B, axis=1)
-            DLs['C'] = DLs.apply(_C, axis=1)
+            nondet = (self.data.qual == 'ND').values
+            A, B, C = _cohn_counts(self.data.res.values[~nondet],
+                                   self.data.res.values[nondet],
+                                   DLs['lower'].values, DLs['upper'].values)
+            DLs['A'] = A
+            DLs['B'] = B
+            DLs['C'] = C
 
             # add an extra row
             DLs = DLs.reindex(range(DLs.shape[0]+1))
@@ -293,70 +632,17 @@ class MR(object):
 
         Then the ranks of non-censored equivalent data values are averaged.
         '''
-        # get the length of the dataset and initialize the normal (raw) ranks
-        self.data['Norm Ranks'] = float(self.N_tot)
-
-        #norm_ranks = np.ones(self.N_tot, dtype='f2')
-
-        # loop through each value and compare to the previous value
-        # see docstring for more info on the logic behind all this
-        for n, index in enumerate(self.data.index):
-            if n == 0 \
-            or self.data['DLIndex'].iloc[n] != self.data['DLIndex'].iloc[n-1] \
-            or self.data.qual.iloc[n] != self.data.qual.iloc[n-1]:
-                self.data.loc[index, 'Norm Ranks'] = 1
-            else:
-                self.data.loc[index, 'Norm Ranks'] = self.data['Norm Ranks'].iloc[n-1] + 1
-
-        # go through each index and see if the value is a detection
-        # and average the ranks of all equivalent values,
-        def avgrank(r):
-            if r['qual'] != 'ND':
-                index = (self.data.DLIndex == r['DLIndex']) & \
-                        (self.data.res == r['res']) & \
-                        (self.data.qual != 'ND')
-                return self.data['Norm Ranks'][index].mean()
-            else:
-                return r['Norm Ranks']
-
-        self.data['Avg Ranks'] = self.data.apply(avgrank, axis=1)
+        norm_ranks, avg_ranks = _ros_ranks(self.data['res'].values,
+                                           self.data['DLIndex'].values,
+                                           (self.data['qual'] == 'ND').values)
+        self.data['Norm Ranks'] = norm_ranks
+        self.data['Avg Ranks'] = avg_ranks
 
     def estimator(self):
         '''
         Estimates the values of the censored data
         '''
 
-        def _ros_plotting_pos(row):
-            '''
-            Helper function to compute the ROS'd plotting position
-            '''
-            dl_1 = self.DLs.iloc[row['DLIndex']]
-            dl_2 = self.DLs.iloc[row['DLIndex']+1]
-            if row['qual'] == 'ND':
-                return (1 - dl_1['PE']) * row['Norm Ranks']/(dl_1['C']+1)
-            else:
-                return (1 - dl_1['PE']) + (dl_1['PE'] - dl_2['PE']) * \
-                        row['Norm Ranks'] / (dl_1['A']+1)
-
-        def _select_final_data(row):
-            '''
-            Helper fucntion to select "final" data from original detects
-            and estimated non-detects
-            '''
-            if row['qual'] == 'ND':
-                return row['modeled_data']
-            else:
-                return row['res']
-
-        def _select_half_DLs(row):
-            '''
-            Helper function to select half DLs when there are too few detects
-            '''
-            if row['qual'] == 'ND':
-                return 0.5 * row['res']
-            else:
-                return row['res']
-
         # detect/non-detect selectors
         detect_selector = self.data.qual != 'ND'
         nondet_selector = self.data.qual == 'ND'
@@ -367,19 +653,27 @@ class MR(object):
 
         # if there are too few detects, use half DL
         elif self.N_tot - self.N_nd < 2 or self.N_nd/self.N_tot > 0.8:
-            self.data['final_data'] = self.data.apply(_select_half_DLs, axis=1)
+            self.data['final_data'] = np.where(nondet_selector,
+                                               0.5 * self.data['res'],
+                                               self.data['res'])
 
         # in most cases, actually use the MR method to estimate NDs
         else:
             # compute the PE values
-            for j in self.DLs.index[:-1][::-1]:
-                self.DLs.loc[j, 'PE'] = self.DLs.loc[j+1, 'PE'] + \
-                   self.DLs.loc[j, 'A'] / \
-                   (self.DLs.loc[j, 'A'] + self.DLs.loc[j, 'B']) * \
-                   (1 - self.DLs.loc[j+1, 'PE'])
+            self.DLs['PE'] = _ros_PE(self.DLs['A'].values[:-1],
+                                     self.DLs['B'].values[:-1])
 
             # compute the plotting position of the data (uses the PE stuff)
-            self.data['plot_pos'] = self.data.apply(_ros_plotting_pos, axis=1)
+            j = self.data['DLIndex'].values
+            PE = self.DLs['PE'].values
+            A = self.DLs['A'].values
+            C = self.DLs['C'].values
+            ranks = self.data['Norm Ranks'].values
+            self.data['plot_pos'] = np.where(
+                nondet_selector,
+                (1 - PE[j]) * ranks / (C[j] + 1),
+                (1 - PE[j]) + (PE[j] - PE[j + 1]) * ranks / (A[j] + 1)
+            )
 
             # correctly sort the plotting positions of the ND data:
             # ND_plotpos = self.data['plot_pos'][self.data['qual'] == 'ND']
@@ -411,10 +705,9 @@ class MR(object):
             )
 
             # select out the final data
-            self.data['final_data'] = self.data.apply(
-                _select_final_data,
-                axis=1
-            )
+            self.data['final_data'] = np.where(nondet_selector,
+                                               self.data['modeled_data'],
+                                               self.data['res'])
 
         return self.data
 
@@ -444,3 +737,237 @@ class MR(object):
         plt.tight_layout()
         fig.savefig(filename)
         return fig
+
+
+class IncrementalMR(object):
+    '''Regression on Order Statistics of a dataset that grows (or shrinks)
+    over time
+
+    The detects and non-detects are kept in two sorted arrays. Each new
+    or removed result is located with a binary search, and the
+    detection limit counts, plotting positions, and regression are only
+    recomputed when the estimates are queried after a change.
+
+    Parameters
+    ----------
+    values : optional array-like
+        The initial results. Non-detects should be set to their
+        detection limit. Must all be positive.
+
+    censored : optional array-like of bools
+        True for the initial non-detects. By default, all of the
+        initial results are detects.
+
+    fitlogs : optional bool (default = True)
+        Fit the regression to the logs of the detects.
+
+    dist : optional string or distribution (default = 'norm')
+        The name of a distribution in `scipy.stats` (or the
+        distribution itself) used to compute the Z-scores of the
+        plotting positions.
+
+    Attributes
+    ----------
+    N_tot : int
+        Total number of results in the dataset
+
+    N_nd : int
+        Total number of non-detect results in the dataset.
+
+    data : pandas DataFrame
+        The results (`res`), qualifiers (`qual`, either 'ND' or '='),
+        and estimated data (`final_data`) sorted as by `rosSort`.
+
+    debug : pandas DataFrame
+        The `data` DataFrame with the plotting positions and the
+        Z-scores.
+
+    DLs : pandas DataFrame
+        The unique detection limits with their `A`, `B`, `C`, and `PE`
+        quantities (see `MR.DLs`).
+
+    fit : scipy.stats linregress result or None
+        The regression of the detects on their Z-scores (see `MR.fit`),
+        or None if the non-detects aren't estimated by regression.
+
+    Examples
+    --------
+    >>> from wqio.algo import ros
+    >>> mr = ros.IncrementalMR(values, censored)
+    >>> mr.add([4.5, 2.0], [False, True])
+    >>> mr.data.final_data
+
+    '''
+
+    def __init__(self, values=None, censored=None, fitlogs=True,
+                 dist='norm'):
+        self.fitlogs = fitlogs
+        self.dist = dist
+        self._detects = np.empty(0)
+        self._nondetects = np.empty(0)
+        self._estimates = None
+        self._DLs = None
+        self._fit = None
+        if values is not None:
+            self.add(values, censored)
+
+    @staticmethod
+    def _split(values, censored):
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        if censored is None:
+            censored = np.zeros(values.shape, dtype=bool)
+        censored = np.atleast_1d(np.asarray(censored, dtype=bool))
+        if values.shape != censored.shape or values.ndim != 1:
+            raise ValueError("`values` and `censored` must be 1-D arrays of "
+                             "the same length")
+        return np.sort(values[~censored]), np.sort(values[censored])
+
+    def add(self, values, censored=None):
+        '''
+        Adds new results to the dataset
+
+        Input:
+            values : array of the results. Non-detects should be set to
+                their detection limit. Must all be positive.
+            censored : boolean array, True for the non-detects (default
+                is all detects)
+
+        Writes:
+            None
+
+        Returns:
+            None
+        '''
+        detects, nondetects = self._split(values, censored)
+        if np.any(detects <= 0) or np.any(nondetects <= 0):
+            raise ValueError('All result values must be positive')
+
+        self._detects = np.insert(
+            self._detects, np.searchsorted(self._detects, detects), detects
+        )
+        self._nondetects = np.insert(
+            self._nondetects, np.searchsorted(self._nondetects, nondetects),
+            nondetects
+        )
+        self._estimates = None
+
+    def remove(self, values, censored=None):
+        '''
+        Removes results from the dataset (one occurrence of each)
+
+        Input:
+            values : array of the results to remove
+            censored : boolean array, True for the non-detects (default
+                is all detects)
+
+        Writes:
+            None
+
+        Returns:
+            None
+        '''
+        def _drop(sorted_values, values):
+            if values.shape[0] == 0:
+                return sorted_values
+
+            # the nth repeat of a value is the nth occurrence in the data
+            first = np.searchsorted(values, values, side='left')
+            position = np.searchsorted(sorted_values, values, side='left')
+            position += np.arange(values.shape[0]) - first
+            found = position < sorted_values.shape[0]
+            found[found] = sorted_values[position[found]] == values[found]
+            if not found.all():
+                raise ValueError('{} is not in the dataset'.format(
+                    values[~found][0]
+                ))
+            return np.delete(sorted_values, position)
+
+        detects, nondetects = self._split(values, censored)
+        self._detects = _drop(self._detects, detects)
+        self._nondetects = _drop(self._nondetects, nondetects)
+        self._estimates = None
+
+    @property
+    def N_tot(self):
+        return self._detects.shape[0] + self._nondetects.shape[0]
+
+    @property
+    def N_nd(self):
+        return self._nondetects.shape[0]
+
+    def _refresh(self):
+        '''
+        Recomputes the plotting positions, Z-scores, estimates, detection
+        limit table, and fit if the dataset has changed since they were
+        last computed
+        '''
+        if self._estimates is None:
+            res = np.hstack([self._nondetects, self._detects])
+            nondet = np.arange(res.shape[0]) < self.N_nd
+            final, plot_pos, Z = _ros_sorted(res, nondet, self.fitlogs,
+                                             self.dist)
+
+            # the regression is only used in the same cases as `MR.estimator`
+            N_det = self.N_tot - self.N_nd
+            regression = self.N_nd > 0 and N_det >= 2 and self.N_nd <= 0.8 * self.N_tot
+
+            self._DLs = self._DL_table(res, nondet, regression)
+            self._fit = None
+            if regression:
+                detect_vals = res[~nondet]
+                if self.fitlogs:
+                    detect_vals = np.log(detect_vals)
+                self._fit = stats.linregress(Z[~nondet], detect_vals)
+
+            self._estimates = pandas.DataFrame(
+                {'final_data': final, 'res': res,
+                 'qual': np.where(nondet, 'ND', '='),
+                 'plot_pos': plot_pos, 'Zprelim': Z},
+                columns=['final_data', 'res', 'qual', 'plot_pos', 'Zprelim']
+            )
+        return self._estimates
+
+    def _DL_table(self, res, nondet, regression):
+        '''
+        Builds the detection limit table in the format of `MR.cohn`
+        (with a trailing row for the space above the highest DL). The
+        exceedance probabilities are only computed if the regression is
+        used, as in `MR.estimator`.
+        '''
+        dl_cols = ['DL', 'lower', 'upper', 'A', 'B', 'C', 'PE']
+        lower, upper = _ros_DL_bounds(res, nondet)
+        if lower.shape[0] == 0:
+            return pandas.DataFrame(np.empty((0, 7)), columns=dl_cols)
+
+        A, B, C = _cohn_counts(self._detects, self._nondetects, lower, upper)
+        if regression:
+            PE = _ros_PE(A, B)
+        else:
+            PE = np.zeros(lower.shape[0] + 1)
+
+        def pad(values):
+            return np.append(values, np.nan)
+
+        return pandas.DataFrame(
+            {'DL': pad(lower), 'lower': pad(lower), 'upper': pad(upper),
+             'A': pad(A), 'B': pad(B), 'C': pad(C), 'PE': PE},
+            columns=dl_cols
+        )
+
+    @property
+    def data(self):
+        return self._refresh()[['final_data', 'res', 'qual']]
+
+    @property
+    def debug(self):
+        return self._refresh()
+
+    @property
+    def DLs(self):
+        self._refresh()
+        return self._DLs.copy()
+
+    @property
+    def fit(self):
+        self._refresh()
+        return self._fit
@@ -200,7 +200,7 @@ class DrainageArea(object):
 class Location(object):
     def __init__(self, dataframe, rescol='res', qualcol='qual', ndval='ND',
                  bsIter=10000, station_type='inflow', useROS=True,
-                 include=True):
+                 include=True, bsSeed=None, bsCensored=False):
         '''
         Object providing convenient access to statics for data
 
@@ -237,6 +237,17 @@ class Location(object):
                 Toggles the inclusion of the location in figures generated
                 from `Datasets` compruised of this location
 
+            bsSeed : optional int, numpy.random.Generator, or None (default)
+                Seed (or source) of the random draws of the bootstrap
+                algorithm. None uses the global numpy random state.
+
+            bsCensored : optional bool (default = False)
+                When True (and `useROS` is True), the bootstrapped means and
+                medians resample the (result, qualifier) pairs and estimate
+                the non-detects with ROS again in every resample, instead of
+                resampling the already-estimated data. The confidence
+                intervals then reflect the uncertainty of the estimates.
+
         General Attributes:
             .station_type (string) : Same as input
             .station_name (string) : 'Influent' or 'Effluent' depending on
@@ -253,6 +264,8 @@ class Location(object):
             .full_data (pandas.DataFrame) : Representation of `self.data`
                 that maintains the qualifiers associated with each result.
             .bsIter (int) : Same as input
+            .bsSeed (int, Generator or None) : Same as input
+            .bsCensored (bool) : Same as input
             .useROS (bool) : Same as input
             .include (bool) : Same as input
             .exclude (bool) : Opposite of `.include`
@@ -309,6 +322,8 @@ class Location(object):
 
         # properties of the dataframe and analysis
         self._bsIter = bsIter
+        self._bsSeed = bsSeed
+        self._bsCensored = bsCensored
         self._useROS = useROS
         self._rescol = rescol
         self._qualcol = qualcol
@@ -340,6 +355,22 @@ class Location(object):
         self._bsIter = value
         self._cache.clear()
 
+    @property
+    def bsSeed(self):
+        return self._bsSeed
+    @bsSeed.setter
+    def bsSeed(self, value):
+        self._bsSeed = value
+        self._cache.clear()
+
+    @property
+    def bsCensored(self):
+        return self._bsCensored
+    @bsCensored.setter
+    def bsCensored(self, value):
+        self._bsCensored = value
+        self._cache.clear()
+
     @property
     def useROS(self):
         return self._useROS
@@ -596,30 +627,105 @@ class Location(object):
             return None
 
     # helper bootstrap objects
+    @cache_readonly
+    def _resample_plan(self):
+        if self.hasData:
+            N = self.data.shape[0]
+            return algo.bootstrap.make_boot_index(
+                N, self.bsIter, dtype=algo.bootstrap._index_dtype(N),
+                random_state=self.bsSeed
+            )
+
+    @cache_readonly
+    def _plan_users(self):
+        '''
+        The bootstrapped statistics with public confidence intervals that
+        still need the resample plan. (The standard deviations aren't
+        waited for, so they may redraw it.)
+        '''
+        users = set(['median', 'mean'])
+        if self.all_positive:
+            users.add('logmean')
+        return users
+
+    def _release_plan(self, user):
+        '''
+        Mark the statistic `user` as bootstrapped and drop the resample
+        plan from the cache once every statistic that uses it has been
+        bootstrapped, so that it's drawn once but not kept around.
+        '''
+        self._plan_users.discard(user)
+        if not self._plan_users:
+            self._cache.pop('_resample_plan', None)
+
+    def _BCA(self, data, statfxn, user):
+        '''
+        BCA estimate and confidence intervals of a statistic of `data`,
+        computed with the location's resample plan. Seeded results are
+        looked up in (and stored to) the on-disk cache of bootstrap
+        results, if enabled (see `wqio.algo.bootstrap.set_cache`).
+        '''
+        def BCA():
+            return algo.bootstrap.Stat(data, statfxn,
+                                       boot_index=self._resample_plan,
+                                       storage='index').BCA()
+
+        try:
+            return algo.bootstrap.cached(BCA, data, statfxn, self.bsIter, 0.05,
+                                         'BCA', self.bsSeed)
+        finally:
+            self._release_plan(user)
+
+    def _censored_BCA(self, statfxn, user):
+        '''
+        BCA estimate and confidence intervals of a statistic of the data,
+        estimating the non-detects of every resample with ROS (see
+        `wqio.algo.bootstrap.CensoredStat`).
+        '''
+        values = self.filtered_data[self._rescol].values
+        censored = (self.filtered_data[self._qualcol] == self._ndval).values
+
+        def BCA():
+            return algo.bootstrap.CensoredStat(values, censored, statfxn,
+                                               boot_index=self._resample_plan).BCA()
+
+        try:
+            return algo.bootstrap.cached(BCA, np.vstack([values, censored]),
+                                         statfxn, self.bsIter, 0.05,
+                                         'censored BCA', self.bsSeed)
+        finally:
+            self._release_plan(user)
+
+    def _bootstrap(self, statfxn, user):
+        if self.bsCensored and self.useROS:
+            return self._censored_BCA(statfxn, user)
+        else:
+            return self._BCA(self.data, statfxn, user)
+
     @cache_readonly
     def _median_boostrap(self):
         if self.hasData:
-            return algo.bootstrap.Stat(self.data, np.median, NIter=self.bsIter).BCA()
+            return self._bootstrap(np.median, 'median')
 
     @cache_readonly
     def _mean_boostrap(self):
         if self.hasData:
-            return algo.bootstrap.Stat(self.data, np.mean, NIter=self.bsIter).BCA()
+            return self._bootstrap(np.mean, 'mean')
 
     @cache_readonly
     def _std_boostrap(self):
         if self.hasData:
-            return algo.bootstrap.Stat(self.data, np.std, NIter=self.bsIter).BCA()
+            return self._BCA(self.data, np.std, 'std')
 
     @cache_readonly
     def _logmean_boostrap(self):
         if self.all_positive and self.hasData:
-            return algo.bootstrap.Stat(np.log(self.data), np.mean, NIter=self.bsIter).BCA()
+            return self._BCA(np.log(self.data), np.mean, 'logmean')
 
     @cache_readonly
     def _logstd_boostrap(self):
         if self.all_positive and self.hasData:
-            return algo.bootstrap.Stat(np.log(self.data), np.std, NIter=self.bsIter).BCA()
+            return self._BCA(np.log(self.data), np.std, 'logstd')
 
     def boxplot_stats(self, log=True, bacteria=False):
         bxpstats = {
@@ -968,7 +1074,8 @@ class Dataset(object):
     # TODO: constructor should take dataframe, and build Location object,
     # not the other way around. This will allow Dataset.influent = None
     # by passing in a dataframe where df.shape[0] == 0
-    def __init__(self, influent, effluent, useROS=True, name=None, xlsDataDumpFile=None):
+    def __init__(self, influent, effluent, useROS=True, name=None,
+                 xlsDataDumpFile=None, bsSeed=None):
 
         ## TODO 2013-11-12: need to use useROS to set useROS attr of the locations,
         ## then use [Location].data for the stats #duh
@@ -982,6 +1089,10 @@ class Dataset(object):
         self._useROS = useROS
         self._definition = {}
         self._cache = resettable_cache()
+        self._bsSeed = None
+        self._contrast_seed = None
+        if bsSeed is not None:
+            self.bsSeed = bsSeed
 
     @property
     def useROS(self):
@@ -993,6 +1104,34 @@ class Dataset(object):
         self.effluent.useROS = value
         self._useROS = value
 
+    @property
+    def bsSeed(self):
+        return self._bsSeed
+    @bsSeed.setter
+    def bsSeed(self, value):
+        self._cache.clear()
+        if value is None:
+            # back to the global numpy random state
+            influent_seed, effluent_seed, contrast_seed = None, None, None
+        else:
+            influent_seed, effluent_seed, contrast_seed = \
+                algo.bootstrap.spawn_seeds(value, 3)
+        self.influent.bsSeed = influent_seed
+        self.effluent.bsSeed = effluent_seed
+        self.contrast_seed = contrast_seed
+        self._bsSeed = value
+
+    @property
+    def contrast_seed(self):
+        '''Seed of the resamples of `bootstrap_contrast`. Set along with
+        the locations' seeds by `bsSeed`, or on its own when the
+        locations are seeded elsewhere (e.g., by a `DataCollection`).'''
+        return self._contrast_seed
+    @contrast_seed.setter
+    def contrast_seed(self, value):
+        self._cache.clear()
+        self._contrast_seed = value
+
     @cache_readonly
     def data(self):
         if self.effluent.hasData:
@@ -1078,6 +1217,84 @@ class Dataset(object):
             )
         return overlap
 
+    def bootstrap_contrast(self, statfxn=np.median, contrast='difference',
+                           paired=False):
+        '''
+        BCA estimate and confidence intervals of a contrast between a
+        statistic of the influent and of the effluent data.
+
+        Parameters
+        ----------
+        statfxn : optional function (default is numpy.median)
+            Statistic of each location. Must accept an `axis` keyword.
+        contrast : optional string or function (default = 'difference')
+            'difference' (influent - effluent), 'ratio' (effluent /
+            influent), or 'percent_removal'. See
+            `wqio.algo.bootstrap.TwoSampleStat`.
+        paired : optional bool (default = False)
+            Resample the pairs of observations in `paired_data` instead
+            of the data of each location independently. Either way, the
+            ROS-estimated results are used if `useROS` is True.
+
+        Returns
+        -------
+        result : float
+        CI : numpy array of floats
+            Or None if there aren't any data to compare.
+
+        Raises
+        ------
+        ValueError
+            If `statfxn` takes logs (e.g., the geometric mean) and some
+            of the data aren't positive.
+
+        '''
+        if paired and self.n_pairs > 0:
+            # results of each location, matched up on the paired samples
+            pairs = pandas.DataFrame({
+                'inflow': self.influent.full_data['res'],
+                'outflow': self.effluent.full_data['res'],
+            }).reindex(self.paired_data.index).dropna()
+            infl = pairs['inflow'].values
+            effl = pairs['outflow'].values
+        elif not paired and self.influent.hasData and self.effluent.hasData:
+            infl = self.influent.data
+            effl = self.effluent.data
+        else:
+            return None
+
+        logfxns = [algo.bootstrap.geomean, algo.bootstrap.logmean,
+                   algo.bootstrap.logstd]
+        if any(statfxn is fxn for fxn in logfxns):
+            if np.any(infl <= 0) or np.any(effl <= 0):
+                raise ValueError("`{}` requires strictly positive data"
+                                 .format(statfxn.__name__))
+
+        bs = algo.bootstrap.TwoSampleStat(infl, effl, statfxn=statfxn,
+                                          contrast=contrast, paired=paired,
+                                          NIter=self.influent.bsIter,
+                                          seed=self.contrast_seed)
+        return bs.BCA()
+
+    @cache_readonly
+    def median_reduction(self):
+        '''Influent median minus effluent median, and its BCA
+        confidence intervals'''
+        return self.bootstrap_contrast(np.median, 'difference')
+
+    @cache_readonly
+    def percent_removal(self):
+        '''Percent reduction of the median concentration, and its BCA
+        confidence intervals'''
+        return self.bootstrap_contrast(np.median, 'percent_removal')
+
+    @cache_readonly
+    def geomean_ratio(self):
+        '''Ratio of the effluent to the influent geometric means, and its
+        BCA confidence intervals. Raises a ValueError if any of the data
+        aren't positive.'''
+        return self.bootstrap_contrast(algo.bootstrap.geomean, 'ratio')
+
     @cache_readonly
     def wilcoxon_z(self):
         '''The Wilcoxon Z-statistic.
@@ -1795,7 +2012,7 @@ class DataCollection(object):
     def __init__(self, dataframe, rescol='res', qualcol='qual',
                  stationcol='station', paramcol='parameter', ndval='ND',
                  othergroups=None, useROS=True, filterfxn=None,
-                 bsIter=10000):
+                 bsIter=10000, bsSeed=None):
 
         self._filterfxn = filterfxn
         self._raw_rescol = rescol
@@ -1813,6 +2030,7 @@ class DataCollection(object):
         self.paramcol = paramcol
         self.ndval = ndval
         self.bsIter = bsIter
+        self._bsSeed = bsSeed
 
         self.groupby = [stationcol, paramcol]
         if othergroups is not None:
@@ -1822,6 +2040,14 @@ class DataCollection(object):
 
         self.columns = self.groupby + [self._raw_rescol, self.qualcol]
 
+    @property
+    def bsSeed(self):
+        return self._bsSeed
+    @bsSeed.setter
+    def bsSeed(self, value):
+        self._cache.clear()
+        self._bsSeed = value
+
     @property
     def filterfxn(self):
         if self._filterfxn is None:
@@ -1835,32 +2061,43 @@ class DataCollection(object):
 
     @cache_readonly
     def tidy(self):
-
-        if self.useROS:
-            def fxn(g):
-                return algo.ros.MR(g).data
-        else:
-            def fxn(g):
-                g[self.roscol] = np.nan
-                return g
-
         _tidy = (
             self.data
                 .reset_index()[self.columns]
                 .groupby(by=self.groupby)
                 .filter(self.filterfxn)
-                .groupby(by=self.groupby)
-                .apply(fxn)
-                .reset_index()
-                .rename(columns={'final_data': self.roscol})
-                .sort(columns=self.groupby)
         )
 
+        codes = self._group_codes(_tidy)
+        results = _tidy[self._raw_rescol].values
+        censored = (_tidy[self.qualcol] == self.ndval).values
+        if self.useROS:
+            # estimate the non-detects of every group at once
+            _tidy[self.roscol] = algo.ros.ros_grouped(results, censored, codes)
+            _tidy[self.qualcol] = np.where(censored, 'ND', '=')
+
+            # sort each group like `algo.ros.rosSort`
+            order = np.lexsort((results, ~censored, codes))
+        else:
+            _tidy[self.roscol] = np.nan
+            order = np.argsort(codes, kind='mergesort')
+
         keep_cols = self.columns + [self.roscol]
-        _tidy = _tidy[keep_cols]
+        _tidy = _tidy[keep_cols].iloc[order].reset_index(drop=True)
 
         return _tidy
 
+    def _group_codes(self, df):
+        '''
+        Integer codes of the groups (`groupby` columns) of each row of
+        `df`, numbered in the sorted order of the groups
+        '''
+        codes = np.zeros(df.shape[0], dtype=np.int64)
+        for col in self.groupby:
+            col_codes, uniques = pandas.factorize(df[col], sort=True)
+            codes, _ = pandas.factorize(codes * len(uniques) + col_codes, sort=True)
+        return codes
+
     @cache_readonly
     def locations(self):
         _locations = []
@@ -1870,14 +2107,15 @@ class DataCollection(object):
                 .filter(self.filterfxn)
                 .groupby(level=self.groupby)
         )
-        for names, data in groups:
+        for (names, data), seed in zip(groups, self._seeds['groups']):
             loc_dict = dict(zip(self.groupby, names))
             locdata = data.copy()
             locdata.index = locdata.index.droplevel(level=self.stationcol)
             loc = Location(
                 locdata, station_type=loc_dict[self.stationcol].lower(),
                 rescol=self._raw_rescol, qualcol=self.qualcol,
-                ndval=self.ndval, bsIter=self.bsIter, useROS=self.useROS
+                ndval=self.ndval, bsIter=self.bsIter, useROS=self.useROS,
+                bsSeed=seed
             )
 
             loc.definition = loc_dict
@@ -1890,7 +2128,8 @@ class DataCollection(object):
         _datasets = []
         groupcols = list(filter(lambda g: g != self.stationcol, self.groupby))
 
-        for names, data in self.data.groupby(level=groupcols):
+        groups = self.data.groupby(level=groupcols)
+        for (names, data), seed in zip(groups, self._seeds['datasets']):
             ds_dict = dict(zip(groupcols, names))
 
             ds_dict[self.stationcol] = 'inflow'
@@ -1905,6 +2144,10 @@ class DataCollection(object):
             ds = Dataset(infl, effl, useROS=self.useROS, name=dsname)
             ds.definition = ds_dict
 
+            # only seed the contrasts: the locations are shared with
+            # `self.locations` and keep their own seeds
+            ds.contrast_seed = seed
+
             _datasets.append(ds)
 
         return _datasets
@@ -1928,11 +2171,11 @@ class DataCollection(object):
 
     @cache_readonly
     def logmean(self):
-        return self._generic_stat(lambda x, axis=0: np.mean(np.log(x), axis=axis), statname='Log-mean')
+        return self._generic_stat(algo.bootstrap.logmean, statname='Log-mean')
 
     @cache_readonly
     def logstd(self):
-        return self._generic_stat(lambda x, axis=0: np.std(np.log(x), axis=axis), statname='Log-std. dev.')
+        return self._generic_stat(algo.bootstrap.logstd, statname='Log-std. dev.')
 
     @cache_readonly
     def geomean(self):
@@ -1950,18 +2193,45 @@ class DataCollection(object):
     def count(self):
         return self._generic_stat(lambda x: x.count(), bootstrap=False, statname='Count')
 
-    def _generic_stat(self, statfxn, bootstrap=True, statname=None):
-        def CIs(x):
-            bs = algo.bootstrap.Stat(x[self.rescol].values, statfxn=statfxn)
-            stat, (lci, uci) = bs.BCA()
-            statnames = ['lower', 'stat', 'upper']
-            return pandas.Series([lci, stat, uci], index=statnames)
+    @cache_readonly
+    def _seeds(self):
+        '''
+        Independent seeds of the groups (i.e., locations) and of the
+        datasets of the collection, spawned once per `bsSeed`. The
+        global numpy random state is used for everything when `bsSeed`
+        is None.
+        '''
+        N_groups = (
+            self.data
+                .groupby(level=self.groupby)
+                .filter(self.filterfxn)
+                .groupby(level=self.groupby)
+                .ngroups
+        )
+        groupcols = [g for g in self.groupby if g != self.stationcol]
+        N_datasets = self.data.groupby(level=groupcols).ngroups
+
+        if self.bsSeed is None:
+            seeds = [None] * (N_groups + N_datasets)
+        else:
+            seeds = algo.bootstrap.spawn_seeds(self.bsSeed, N_groups + N_datasets)
+
+        return {'groups': seeds[:N_groups], 'datasets': seeds[N_groups:]}
 
+    def _generic_stat(self, statfxn, bootstrap=True, statname=None):
         if bootstrap:
+            # bootstrap every group at once from the concatenated results
+            names, results = zip(*[
+                (name, group[self.rescol].values)
+                for name, group in self.tidy.groupby(by=self.groupby)
+            ])
+            res, CI = algo.bootstrap.grouped_BCA(results, statfxn=statfxn,
+                                                 seeds=self._seeds['groups'])
+
+            index = pandas.MultiIndex.from_tuples(names, names=self.groupby)
             stat = (
-                self.tidy
-                    .groupby(by=self.groupby)
-                    .apply(CIs)
+                pandas.DataFrame({'lower': CI[:, 0], 'stat': res, 'upper': CI[:, 1]},
+                                 index=index, columns=['lower', 'stat', 'upper'])
                     .unstack(level=self.stationcol)
             )
         else:
@@ -1,15 +1,22 @@
+import os
+import shutil
+import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
 from nose.tools import *
 import numpy.testing as nptest
 import numpy as np
 import scipy.optimize as opt
 
 from wqio import testing
-from wqio.algo import bootstrap
+from wqio.algo import bootstrap, ros
 
 
 def test__boot_strap():
     x = bootstrap._bootstrapMixin()
     assert_true(hasattr(x, '_acceleration'))
+    assert_true(hasattr(x, '_make_boot_index'))
     assert_true(hasattr(x, '_make_bootstrap_array'))
     assert_true(hasattr(x, '_eval_BCA'))
     assert_true(hasattr(x, '_eval_percentile'))
@@ -75,6 +82,640 @@ class test_Stat:
         known_acceleration = -0.024051865664929263
         assert_almost_equal(self.bsStat._acceleration(), known_acceleration, places=5)
 
+    def test__jackknife_acceleration(self):
+        known_acceleration = 0.024051865664929263
+        assert_almost_equal(self.bsStat._jackknife_acceleration(), known_acceleration, places=5)
+
+    def test_BCA_jackknife(self):
+        BCA_res, BCA_ci = self.bsStat.BCA(acceleration='jackknife')
+        assert_true(BCA_ci[0] < BCA_res < BCA_ci[1])
+
+    @raises(ValueError)
+    def test_BCA_bad_acceleration(self):
+        self.bsStat.BCA(acceleration='junk')
+
+
+def test_Stat_engines():
+    data = np.array(testing.getTestROSData().res)
+    np.random.seed(0)
+    vectorized = bootstrap.Stat(data, NIter=250, engine='vectorized')
+    np.random.seed(0)
+    loop = bootstrap.Stat(data, NIter=250, engine='loop')
+    nptest.assert_array_equal(vectorized._boot_array, loop._boot_array)
+    nptest.assert_array_equal(vectorized._boot_stats, loop._boot_stats)
+
+
+@raises(ValueError)
+def test_Stat_bad_engine():
+    data = np.array(testing.getTestROSData().res)
+    bootstrap.Stat(data, NIter=250, engine='junk')
+
+
+def test_Stat_boot_index():
+    data = np.array(testing.getTestROSData().res)
+    index = bootstrap.make_boot_index(data.shape[0], 250)
+    bsStat = bootstrap.Stat(data, boot_index=index)
+    assert_equal(bsStat.NIter, 250)
+    nptest.assert_array_equal(bsStat._boot_array, data[index])
+
+
+@raises(ValueError)
+def test_Stat_bad_boot_index():
+    data = np.array(testing.getTestROSData().res)
+    index = bootstrap.make_boot_index(data.shape[0] - 1, 250)
+    bootstrap.Stat(data, boot_index=index)
+
+
+def test_Stat_index_storage():
+    data = np.array(testing.getTestROSData().res)
+    np.random.seed(0)
+    full = bootstrap.Stat(data, NIter=250, storage='array')
+    np.random.seed(0)
+    compact = bootstrap.Stat(data, NIter=250, storage='index')
+    assert_false(hasattr(compact, '_boot_array'))
+    assert_equal(compact._boot_index.dtype, np.uint16)
+    nptest.assert_array_equal(full._boot_stats, compact._boot_stats)
+
+
+def test_Stat_chunk_size():
+    data = np.array(testing.getTestROSData().res)
+    np.random.seed(0)
+    full = bootstrap.Stat(data, NIter=250)
+    np.random.seed(0)
+    chunked = bootstrap.Stat(data, NIter=250, chunk_size=60)
+    assert_false(hasattr(chunked, '_boot_array'))
+    assert_false(hasattr(chunked, '_boot_index'))
+    nptest.assert_array_equal(full._boot_stats, chunked._boot_stats)
+
+
+@raises(ValueError)
+def test_Stat_bad_chunk_size():
+    data = np.array(testing.getTestROSData().res)
+    bootstrap.Stat(data, NIter=250, chunk_size=0)
+
+
+def test_Stat__jackknife_stats():
+    data = np.array(testing.getTestROSData().res)
+    for statfxn in [np.median, np.mean, np.std]:
+        bsStat = bootstrap.Stat(data, statfxn=statfxn, NIter=10)
+        known = [statfxn(np.delete(data, n)) for n in range(data.shape[0])]
+        nptest.assert_array_almost_equal(bsStat._jackknife_stats(), known)
+
+
+def test_Stat_quantile_fast_path():
+    data = np.array(testing.getTestROSData().res)
+    for statfxn in [np.median, bootstrap.Percentile(10), bootstrap.Percentile(90)]:
+        np.random.seed(0)
+        full = bootstrap.Stat(data, statfxn=statfxn, NIter=250)
+        np.random.seed(0)
+        compact = bootstrap.Stat(data, statfxn=statfxn, NIter=250, storage='index')
+        nptest.assert_array_almost_equal(full._boot_stats, compact._boot_stats)
+
+
+def test_Percentile():
+    data = np.array(testing.getTestROSData().res)
+    pctl = bootstrap.Percentile(75)
+    assert_equal(pctl(data), np.percentile(data, 75))
+    nptest.assert_array_equal(pctl(np.vstack([data, data]), axis=1),
+                              np.percentile(np.vstack([data, data]), 75, axis=1))
+
+
+def test_Stat_weights():
+    data = np.array(testing.getTestROSData().res)
+    for statfxn in [np.mean, np.std, bootstrap.logmean, bootstrap.geomean]:
+        np.random.seed(0)
+        gathered = bootstrap.Stat(data, statfxn=statfxn, NIter=250)
+        np.random.seed(0)
+        weighted = bootstrap.Stat(data, statfxn=statfxn, NIter=250,
+                                  weights='multinomial')
+        nptest.assert_array_almost_equal(gathered._boot_stats, weighted._boot_stats)
+
+    for weights in ['poisson', 'dirichlet']:
+        bsStat = bootstrap.Stat(data, statfxn=np.mean, NIter=250,
+                                weights=weights, seed=0)
+        assert_equal(bsStat._boot_stats.shape[0], 250)
+        assert_false(hasattr(bsStat, '_boot_array'))
+        BCA_res, BCA_ci = bsStat.BCA()
+        assert_true(BCA_ci[0] < data.mean() < BCA_ci[1])
+
+
+@raises(ValueError)
+def test_Stat_weights_bad_statfxn():
+    data = np.array(testing.getTestROSData().res)
+    bootstrap.Stat(data, statfxn=np.median, NIter=250, weights='dirichlet')
+
+
+def test_Stat_seed():
+    data = np.array(testing.getTestROSData().res)
+    np.random.seed(0)
+    globalseed = bootstrap.Stat(data, NIter=250)
+    seeded = bootstrap.Stat(data, NIter=250, seed=0)
+    nptest.assert_array_equal(globalseed._boot_stats, seeded._boot_stats)
+
+
+def test_Stat_parallel():
+    data = np.array(testing.getTestROSData().res)
+    bs1 = bootstrap.Stat(data, NIter=250, seed=0, n_jobs=3,
+                         executor=ThreadPoolExecutor(max_workers=3))
+    bs2 = bootstrap.Stat(data, NIter=250, seed=0, n_jobs=3,
+                         executor=ThreadPoolExecutor(max_workers=2))
+    assert_false(hasattr(bs1, '_boot_array'))
+    assert_equal(bs1._boot_stats.shape[0], 250)
+    nptest.assert_array_equal(bs1._boot_stats, bs2._boot_stats)
+
+
+def test_Stat_adaptive():
+    data = np.array(testing.getTestROSData().res)
+    full = bootstrap.Stat(data, NIter=5000, seed=0, chunk_size=250)
+
+    # a loose tolerance stops early on the same random stream
+    loose = bootstrap.Stat(data, NIter=5000, seed=0, chunk_size=250, tol=1.0)
+    assert_true(loose.converged)
+    assert_true(loose.NIter < 5000)
+    assert_equal(loose.NIter % 250, 0)
+    nptest.assert_array_equal(loose._boot_stats, full._boot_stats[:loose.NIter])
+
+    # an impossible tolerance uses all of the iterations
+    tight = bootstrap.Stat(data, NIter=1000, seed=0, chunk_size=250, tol=1e-12)
+    assert_false(tight.converged)
+    assert_equal(tight.NIter, 1000)
+    assert_equal(tight.BCA()[1].shape, (2,))
+
+
+def test_Stat_adaptive_ties():
+    # the median of 35 values only takes a few distinct values, so the
+    # limits of consecutive resamples tie but jump between batches
+    data = np.array(testing.getTestROSData().res)
+    bs = bootstrap.Stat(data, NIter=8000, seed=4, tol=0.01)
+    assert_false(bs.converged)
+    assert_equal(bs.NIter, 8000)
+
+
+def test_Stat_adaptive_acceleration():
+    data = np.array(testing.getTestROSData().res)
+    requested = []
+
+    class RecordingStat(bootstrap.Stat):
+        def _get_acceleration(self, acceleration):
+            requested.append(acceleration)
+            return bootstrap.Stat._get_acceleration(self, acceleration)
+
+    bs = RecordingStat(data, NIter=1000, seed=0, chunk_size=250, tol=1e-12,
+                       acceleration='jackknife')
+    assert_equal(requested, ['jackknife'])
+    nptest.assert_array_equal(bs.BCA()[1], bs.BCA(acceleration='jackknife')[1])
+
+
+@raises(ValueError)
+def test_Stat_adaptive_parallel():
+    data = np.array(testing.getTestROSData().res)
+    bootstrap.Stat(data, NIter=250, n_jobs=2, tol=0.1)
+
+
+def test_Stat_dtype():
+    data = np.array(testing.getTestROSData().res)
+    for kwargs in [{}, dict(storage='index'), dict(chunk_size=100),
+                   dict(statfxn=np.mean, weights='multinomial')]:
+        full = bootstrap.Stat(data, NIter=500, seed=0, **kwargs)
+        single = bootstrap.Stat(data, NIter=500, seed=0, dtype=np.float32, **kwargs)
+        assert_equal(single._boot_stats.dtype, np.float32)
+        if hasattr(single, '_boot_array'):
+            assert_equal(single._boot_array.dtype, np.float32)
+        nptest.assert_allclose(single._boot_stats, full._boot_stats, rtol=1e-5)
+        nptest.assert_allclose(single.BCA()[1], full.BCA()[1], rtol=1e-4)
+
+
+def test_Stat_dtype_ties():
+    # 0.7 rounds down in float32, so resamples whose median ties the
+    # sample median must not be counted as below it
+    data = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.7, 0.7,
+                     0.8, 0.9, 1.0, 1.1, 1.2, 1.3])
+    full = bootstrap.Stat(data, NIter=1000, seed=0)
+    single = bootstrap.Stat(data, NIter=1000, seed=0, dtype=np.float32)
+    assert_equal(np.sum(single._boot_stats < single._bca_prelim(single.prelim_result)),
+                 np.sum(full._boot_stats < full.prelim_result))
+    nptest.assert_allclose(single.BCA()[1], full.BCA()[1], rtol=1e-6)
+
+    columns = single._eval_BCA_columns(np.array([single.prelim_result]),
+                                       single._boot_stats[:, None])
+    nptest.assert_allclose(columns[1][0], full.BCA()[1], rtol=1e-6)
+
+
+@raises(ValueError)
+def test_Stat_bad_dtype():
+    data = np.array(testing.getTestROSData().res)
+    bootstrap.Stat(data, NIter=10, dtype=np.int32)
+
+
+def test_Fit_dtype():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    for linear in [False, True]:
+        full = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0,
+                             linear=linear)
+        single = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0,
+                               linear=linear, dtype=np.float32)
+        assert_equal(single._boot_array.dtype, np.float32)
+        assert_equal(single._boot_stats.dtype, np.float32)
+        nptest.assert_allclose(single._boot_stats, full._boot_stats, rtol=1e-3)
+
+
+def test_Fit_index_storage():
+    data = testing.getTestROSData()
+    np.random.seed(0)
+    full = bootstrap.Fit(np.array(data.index), np.array(data.res),
+                         lambda x, m, b: m*x + b, NIter=100, storage='array')
+    np.random.seed(0)
+    compact = bootstrap.Fit(np.array(data.index), np.array(data.res),
+                            lambda x, m, b: m*x + b, NIter=100, storage='index')
+    assert_false(hasattr(compact, '_boot_array'))
+    nptest.assert_array_equal(full._boot_stats, compact._boot_stats)
+
+
+def test_Fit_chunk_size():
+    data = testing.getTestROSData()
+    np.random.seed(0)
+    full = bootstrap.Fit(np.array(data.index), np.array(data.res),
+                         lambda x, m, b: m*x + b, NIter=100)
+    np.random.seed(0)
+    chunked = bootstrap.Fit(np.array(data.index), np.array(data.res),
+                            lambda x, m, b: m*x + b, NIter=100, chunk_size=30)
+    assert_false(hasattr(chunked, '_boot_array'))
+    nptest.assert_array_equal(full._boot_stats, chunked._boot_stats)
+
+
+def test_Fit_linear():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    for fxn in [lambda x, m, b: m*x + b, lambda x, a, b, c: a*x**2 + b*x + c]:
+        fit = bootstrap.Fit(x, y, fxn, NIter=100, seed=0)
+        fast = bootstrap.Fit(x, y, fxn, NIter=100, seed=0, linear=True)
+        nptest.assert_array_almost_equal(fit._boot_stats, fast._boot_stats, decimal=5)
+
+
+def test_Fit_linear_chunk_size():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    full = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0,
+                         linear=True)
+    chunked = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0,
+                            linear=True, chunk_size=30)
+    nptest.assert_array_almost_equal(full._boot_stats, chunked._boot_stats)
+
+
+@raises(ValueError)
+def test_Fit_linear_nonlinear_fxn():
+    data = testing.getTestROSData()
+    bootstrap.Fit(np.array(data.index, dtype=float), np.array(data.res),
+                  lambda x, a, b: a*np.exp(b*x/10.), NIter=10, linear=True)
+
+
+def test_Fit_warm_start():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    cold = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0)
+    warm = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=100, seed=0,
+                         warm_start=True)
+    assert_equal(warm.n_failures, 0)
+    nptest.assert_array_almost_equal(cold._boot_stats, warm._boot_stats, decimal=5)
+
+
+def test_Fit_failures():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    fit = bootstrap.Fit(x, y, lambda x, a, b: a*np.exp(b*x/10.), NIter=50,
+                        seed=0, warm_start=True, maxfev=8)
+    failed = np.isnan(fit._boot_stats).any(axis=1)
+    assert_true(fit.n_failures > 0)
+    assert_equal(fit.n_failures, failed.sum())
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        assert_equal(fit._valid_boot_stats.shape[0], 50 - fit.n_failures)
+        assert_false(np.isnan(fit.percentile()[1]).any())
+    assert_true(any(issubclass(w.category, RuntimeWarning) for w in caught))
+
+
+@raises(RuntimeError)
+def test_Fit_all_failures():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    fit = bootstrap.Fit(x, y, lambda x, a, b: a*np.exp(b*x/10.), NIter=20,
+                        seed=0, maxfev=3)
+    assert_equal(fit.n_failures, 20)
+    fit.BCA()
+
+
+def test_Fit_parallel():
+    data = testing.getTestROSData()
+    x, y = np.array(data.index, dtype=float), np.array(data.res)
+    bs1 = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=60, seed=0,
+                        n_jobs=3, executor=ThreadPoolExecutor(max_workers=3),
+                        warm_start=True)
+    bs2 = bootstrap.Fit(x, y, lambda x, m, b: m*x + b, NIter=60, seed=0,
+                        n_jobs=3, executor=ThreadPoolExecutor(max_workers=1),
+                        warm_start=True)
+    assert_equal(bs1._boot_stats.shape, (60, 2))
+    nptest.assert_array_equal(bs1._boot_stats, bs2._boot_stats)
+
+
+def test__eval_BCA_columns():
+    data = np.array(testing.getTestROSData().res)
+    bs = bootstrap.Stat(data, NIter=500, seed=0)
+    np.random.seed(0)
+    boot_stats = np.column_stack([
+        np.random.normal(size=500),
+        np.random.lognormal(size=500),
+        np.random.uniform(size=500) - 5,  # all below the estimate
+    ])
+    prelim = np.array([0.1, 1.2, 0.0])
+
+    results, CI = bs._eval_BCA_columns(prelim, boot_stats)
+    for n in range(3):
+        res, ci = bs._eval_BCA(prelim[n], boot_stats[:, n])
+        nptest.assert_almost_equal(results[n], res)
+        nptest.assert_array_almost_equal(CI[n], ci)
+
+    results, CI = bs._eval_percentile_columns(boot_stats)
+    for n in range(3):
+        res, ci = bs._eval_percentile(boot_stats[:, n])
+        nptest.assert_almost_equal(results[n], res)
+        nptest.assert_array_almost_equal(CI[n], ci)
+
+
+def test__skew_acceleration():
+    deviations = np.array([1.0, -2.0, 0.5, 0.5])
+    known = np.sum(deviations**3) / (6 * np.sum(deviations**2)**1.5)
+    nptest.assert_almost_equal(bootstrap._skew_acceleration(deviations), known)
+
+    grouped = bootstrap._skew_acceleration(np.hstack([deviations, np.zeros(3)]),
+                                           np.array([0, 4]))
+    nptest.assert_array_almost_equal(grouped, [known, 0.0])
+
+
+class test_GroupedStat:
+    def setup(self):
+        data = testing.getTestROSData()
+        self.groups = [np.array(data.res[:10]), np.array(data.res[10:13]),
+                       np.array(data.res[13:])]
+        self.values = np.concatenate(self.groups)
+        self.offsets = np.array([0, 10, 13, len(data)])
+        self.NIter = 500
+
+    def check_against_Stat(self, statfxn):
+        gs = bootstrap.GroupedStat(self.values, self.offsets, statfxn=statfxn,
+                                   NIter=self.NIter, seed=[1, 2, 3])
+        assert_equal(gs._boot_stats.shape, (self.NIter, 3))
+        for g, group in enumerate(self.groups):
+            bs = bootstrap.Stat(group, statfxn=statfxn, NIter=self.NIter,
+                                seed=g + 1, storage='index')
+            nptest.assert_almost_equal(gs.prelim_result[g], bs.prelim_result)
+            nptest.assert_array_almost_equal(gs._boot_stats[:, g], bs._boot_stats)
+            nptest.assert_almost_equal(gs._acceleration()[g], bs._acceleration())
+
+    def test_against_Stat(self):
+        for statfxn in [np.median, np.mean, np.std, bootstrap.logmean,
+                        bootstrap.Percentile(75), np.max]:
+            self.check_against_Stat(statfxn)
+
+    def test_single_seed(self):
+        np.random.seed(0)
+        unseeded = bootstrap.GroupedStat(self.values, self.offsets, NIter=100)
+        seeded = bootstrap.GroupedStat(self.values, self.offsets, NIter=100, seed=0)
+        nptest.assert_array_equal(unseeded._boot_stats, seeded._boot_stats)
+
+    def test_BCA(self):
+        gs = bootstrap.GroupedStat(self.values, self.offsets, NIter=self.NIter, seed=0)
+        res, CI = gs.BCA()
+        assert_equal(res.shape, (3,))
+        assert_equal(CI.shape, (3, 2))
+        assert_true(np.all(CI[:, 0] <= CI[:, 1]))
+
+    def test_percentile(self):
+        gs = bootstrap.GroupedStat(self.values, self.offsets, NIter=self.NIter, seed=0)
+        res, CI = gs.percentile()
+        for g in range(3):
+            nptest.assert_array_almost_equal(CI[g], gs._eval_percentile(gs._boot_stats[:, g])[1])
+
+    def test_blocks(self):
+        block_bytes = bootstrap._GROUP_BLOCK_BYTES
+        for statfxn in [np.median, np.mean]:
+            for seed in [0, [1, 2, 3]]:
+                known = bootstrap.GroupedStat(self.values, self.offsets, statfxn=statfxn,
+                                              NIter=self.NIter, seed=seed)
+                try:
+                    # one block per group, the last one split in blocks of rows
+                    bootstrap._GROUP_BLOCK_BYTES = self.NIter * 8 * 12
+                    gs = bootstrap.GroupedStat(self.values, self.offsets, statfxn=statfxn,
+                                               NIter=self.NIter, seed=seed)
+                    assert_equal(gs._group_blocks(), [(0, 1), (1, 2), (2, 3)])
+                finally:
+                    bootstrap._GROUP_BLOCK_BYTES = block_bytes
+                nptest.assert_array_equal(gs._boot_stats, known._boot_stats)
+
+    @raises(ValueError)
+    def test_empty_group(self):
+        bootstrap.GroupedStat(self.values, [0, 10, 10, len(self.values)])
+
+    @raises(ValueError)
+    def test_bad_seeds(self):
+        bootstrap.GroupedStat(self.values, self.offsets, seed=[1, 2])
+
+
+class test_TwoSampleStat:
+    def setup(self):
+        self.x = np.array(testing.getTestROSData().res)
+        np.random.seed(0)
+        self.y = self.x * np.random.uniform(0.2, 0.8, size=self.x.shape[0])
+
+    def test_paired(self):
+        bs = bootstrap.TwoSampleStat(self.x, self.y, paired=True, NIter=200, seed=0)
+        index = bootstrap.make_boot_index(self.x.shape[0], 200, random_state=0)
+        known = np.median(self.x[index], axis=1) - np.median(self.y[index], axis=1)
+        nptest.assert_array_almost_equal(bs._boot_stats, known)
+        nptest.assert_almost_equal(bs.prelim_result,
+                                   np.median(self.x) - np.median(self.y))
+
+    def test_unpaired(self):
+        y = self.y[:20]
+        bs = bootstrap.TwoSampleStat(self.x, y, NIter=200, seed=0)
+        Nx = self.x.shape[0]
+        assert_equal(bs._boot_index.shape, (200, Nx + 20))
+        assert_true(bs._boot_index[:, :Nx].max() < Nx)
+        assert_true(bs._boot_index[:, Nx:].max() < 20)
+        known = (np.median(self.x[bs._boot_index[:, :Nx]], axis=1) -
+                 np.median(y[bs._boot_index[:, Nx:]], axis=1))
+        nptest.assert_array_almost_equal(bs._boot_stats, known)
+
+    def test_contrasts(self):
+        fx, fy = np.mean(self.x), np.mean(self.y)
+        for contrast, known in [('difference', fx - fy), ('ratio', fy / fx),
+                                ('percent_removal', 100 * (fx - fy) / fx),
+                                (lambda x, y: x + y, fx + fy)]:
+            bs = bootstrap.TwoSampleStat(self.x, self.y, statfxn=np.mean,
+                                         contrast=contrast, NIter=100, seed=0)
+            nptest.assert_almost_equal(bs.prelim_result, known)
+            res, CI = bs.BCA()
+            assert_true(CI[0] <= CI[1])
+
+    def test_acceleration(self):
+        # a constant second sample leaves the one-sample acceleration
+        bs = bootstrap.TwoSampleStat(self.x, np.ones(5), statfxn=np.mean,
+                                     NIter=10, seed=0)
+        one = bootstrap.Stat(self.x, statfxn=np.mean, NIter=10, seed=0)
+        nptest.assert_almost_equal(bs._acceleration(), one._jackknife_acceleration())
+
+    @raises(ValueError)
+    def test_bad_contrast(self):
+        bootstrap.TwoSampleStat(self.x, self.y, contrast='junk')
+
+    @raises(ValueError)
+    def test_bad_pairs(self):
+        bootstrap.TwoSampleStat(self.x, self.y[1:], paired=True)
+
+
+class test_CensoredStat:
+    def setup(self):
+        data = testing.getTestROSData()
+        self.values = data.res.values
+        self.censored = (data.qual == 'ND').values
+        self.bs = bootstrap.CensoredStat(self.values, self.censored,
+                                         NIter=100, seed=0)
+
+    def test_prelim_result(self):
+        final = ros.ros_estimate(self.values, self.censored)
+        nptest.assert_almost_equal(self.bs.prelim_result, np.median(final))
+
+    def test_boot_stats(self):
+        index = bootstrap.make_boot_index(self.values.shape[0], 100,
+                                          random_state=0)
+        nptest.assert_array_equal(self.bs._boot_index, index)
+        for row in [0, 57, 99]:
+            final = ros.ros_estimate(self.values[index[row]],
+                                     self.censored[index[row]])
+            nptest.assert_almost_equal(self.bs._boot_stats[row], np.median(final))
+
+    def test_no_NDs(self):
+        index = self.bs._boot_index
+        bs = bootstrap.CensoredStat(self.values, np.zeros_like(self.censored),
+                                    boot_index=index)
+        known = bootstrap.Stat(self.values, boot_index=index)
+        nptest.assert_array_almost_equal(bs.BCA()[1], known.BCA()[1])
+
+    @raises(ValueError)
+    def test_bad_shapes(self):
+        bootstrap.CensoredStat(self.values, self.censored[1:])
+
+
+class test_ResultCache:
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = bootstrap.set_cache(self.directory)
+        self.data = np.array(testing.getTestROSData().res)
+        self.calls = 0
+
+    def teardown(self):
+        bootstrap.set_cache(None)
+        shutil.rmtree(self.directory)
+
+    def compute(self):
+        self.calls += 1
+        return bootstrap.Stat(self.data, NIter=100, seed=0).BCA()
+
+    def test_get_cache(self):
+        assert_true(bootstrap.get_cache() is self.cache)
+
+    def test_key(self):
+        key = self.cache.key(self.data, np.median, 100, 0.05, 'BCA', 0)
+        assert_equal(key, self.cache.key(self.data.copy(), np.median, 100, 0.05, 'BCA', 0))
+        assert_not_equal(key, self.cache.key(self.data, np.mean, 100, 0.05, 'BCA', 0))
+        assert_not_equal(key, self.cache.key(self.data, np.median, 100, 0.05, 'BCA', 1))
+        assert_not_equal(key, self.cache.key(self.data[1:], np.median, 100, 0.05, 'BCA', 0))
+        assert_not_equal(key, self.cache.key(self.data, bootstrap.Percentile(50),
+                                             100, 0.05, 'BCA', 0))
+
+    def test_key_version(self):
+        key = self.cache.key(self.data, np.median, 100, 0.05, 'BCA', 0)
+        version = bootstrap._CACHE_VERSION
+        try:
+            bootstrap._CACHE_VERSION = version + 1
+            new_key = self.cache.key(self.data, np.median, 100, 0.05, 'BCA', 0)
+        finally:
+            bootstrap._CACHE_VERSION = version
+        assert_not_equal(key, new_key)
+
+    def test_key_not_reproducible(self):
+        assert_true(self.cache.key(self.data, np.median, 100, 0.05, 'BCA', None) is None)
+        assert_true(self.cache.key(self.data, lambda x: x.max(), 100, 0.05, 'BCA', 0) is None)
+
+        def statfxn(x):
+            return x.max()
+        statfxn.__module__ = '__main__'
+        statfxn.__qualname__ = 'statfxn'
+        assert_true(self.cache.key(self.data, statfxn, 100, 0.05, 'BCA', 0) is None)
+
+    def test_cached(self):
+        first = bootstrap.cached(self.compute, self.data, np.median, 100, 0.05, 'BCA', 0)
+        second = bootstrap.cached(self.compute, self.data, np.median, 100, 0.05, 'BCA', 0)
+        assert_equal(self.calls, 1)
+        nptest.assert_array_equal(first[1], second[1])
+
+    def test_unseeded_not_cached(self):
+        bootstrap.cached(self.compute, self.data, np.median, 100, 0.05, 'BCA', None)
+        bootstrap.cached(self.compute, self.data, np.median, 100, 0.05, 'BCA', None)
+        assert_equal(self.calls, 2)
+        assert_equal(len(os.listdir(self.directory)), 0)
+
+    def test_eviction(self):
+        cache = bootstrap.ResultCache(self.directory, max_bytes=1000)
+        for seed in range(20):
+            key = cache.key(self.data, np.median, 100, 0.05, 'BCA', seed)
+            cache.put(key, (1.0, np.zeros(2)))
+        total = sum(os.path.getsize(os.path.join(self.directory, f))
+                    for f in os.listdir(self.directory))
+        assert_true(0 < total <= 1000)
+        assert_true(cache.get(key) is not None)
+        assert_equal(cache._total, total)
+
+    def test_eviction_threshold(self):
+        cache = bootstrap.ResultCache(self.directory, max_bytes=10000)
+        scans = []
+        entries = cache._entries
+        cache._entries = lambda: scans.append(1) or entries()
+        for seed in range(5):
+            key = cache.key(self.data, np.median, 100, 0.05, 'BCA', seed)
+            cache.put(key, (1.0, np.zeros(2)))
+        # the directory isn't listed until the cache is full
+        assert_equal(len(scans), 0)
+        assert_equal(cache._total, sum(os.path.getsize(os.path.join(self.directory, f))
+                                       for f in os.listdir(self.directory)))
+
+    def test_grouped_BCA(self):
+        groups = [self.data[:10], self.data[10:]]
+        res, CI = bootstrap.grouped_BCA(groups, NIter=100, seeds=[1, 2])
+        assert_equal(len(os.listdir(self.directory)), 2)
+        # medians are bootstrapped one group at a time
+        for n, group in enumerate(groups):
+            bs = bootstrap.Stat(group, NIter=100, seed=n + 1, storage='index')
+            known_res, known_CI = bs.BCA()
+            assert_equal(res[n], known_res)
+            nptest.assert_array_equal(CI[n], known_CI)
+
+        # the cached group is reused, the other is bootstrapped again
+        res2, CI2 = bootstrap.grouped_BCA([groups[0], self.data[:5]], NIter=100,
+                                          seeds=[1, 3])
+        assert_equal(len(os.listdir(self.directory)), 3)
+        nptest.assert_array_equal(CI2[0], CI[0])
+
+    def test_grouped_BCA_mean(self):
+        groups = [self.data[:10], self.data[10:]]
+        res, CI = bootstrap.grouped_BCA(groups, statfxn=np.mean, NIter=100,
+                                        seeds=[1, 2])
+        gs = bootstrap.GroupedStat(self.data, [0, 10, len(self.data)],
+                                   statfxn=np.mean, NIter=100, seed=[1, 2])
+        known_res, known_CI = gs.BCA()
+        nptest.assert_array_equal(res, known_res)
+        nptest.assert_array_equal(CI, known_CI)
+
 
 class test_Fit:
     def setup(self):
@@ -36,6 +36,164 @@ def test_rosSort():
     pass
 
 
+def test__cohn_counts():
+    detects = np.array([1.0, 2.0, 2.0, 3.5, 5.0, 7.0, 9.0])
+    nondetects = np.array([2.0, 2.0, 5.0, 1.0])
+    lower = np.array([1.0, 2.0, 5.0])
+    upper = np.array([2.0, 5.0, np.inf])
+    A, B, C = ros._cohn_counts(detects, nondetects, lower, upper)
+    nptest.assert_array_equal(A, [1, 3, 3])
+    nptest.assert_array_equal(B, [1, 4, 8])
+    nptest.assert_array_equal(C, [1, 2, 1])
+
+
+def test__ros_ranks():
+    res = np.array([2.0, 2.0, 5.0, 1.0, 3.0, 3.0, 3.0, 6.0, 7.0, 7.0])
+    DLIndex = np.array([0, 0, 1, 0, 0, 0, 0, 1, 1, 1])
+    censored = np.array([True, True, True, False, False, False, False,
+                         False, False, False])
+    norm_ranks, avg_ranks = ros._ros_ranks(res, DLIndex, censored)
+    nptest.assert_array_equal(norm_ranks, [1, 2, 1, 1, 2, 3, 4, 1, 2, 3])
+    nptest.assert_array_equal(avg_ranks, [1, 2, 1, 1, 3, 3, 3, 1, 2.5, 2.5])
+
+
+class test_ros_estimate(object):
+    def setup(self):
+        self.data = testing.getTestROSData()
+        self.values = self.data.res.values
+        self.censored = (self.data.qual == 'ND').values
+
+    def test_against_MR(self):
+        mr = ros.MR(self.data)
+        final, plot_pos, Z = ros.ros_estimate(self.values, self.censored,
+                                              full_output=True)
+        nptest.assert_array_almost_equal(np.sort(final),
+                                         np.sort(mr.data.final_data))
+        nptest.assert_array_almost_equal(np.sort(plot_pos),
+                                         np.sort(mr.debug.plot_pos))
+        nptest.assert_array_almost_equal(np.sort(Z), np.sort(mr.debug.Zprelim))
+
+    def test_input_order(self):
+        final = ros.ros_estimate(self.values, self.censored)
+        nptest.assert_array_equal(final[~self.censored], self.values[~self.censored])
+
+    def test_no_NDs(self):
+        final, plot_pos, Z = ros.ros_estimate(self.values, np.zeros_like(self.censored),
+                                              full_output=True)
+        nptest.assert_array_equal(final, self.values)
+        assert_true(np.isnan(plot_pos).all())
+
+    def test_half_DLs(self):
+        censored = np.ones_like(self.censored)
+        censored[0] = False
+        final = ros.ros_estimate(self.values, censored)
+        nptest.assert_array_equal(final[1:], 0.5 * self.values[1:])
+        assert_equal(final[0], self.values[0])
+
+    @raises(ValueError)
+    def test_bad_shapes(self):
+        ros.ros_estimate(self.values, self.censored[1:])
+
+    @raises(ValueError)
+    def test_zero_data(self):
+        values = self.values.copy()
+        values[0] = 0.0
+        ros.ros_estimate(values, self.censored)
+
+    @raises(ValueError)
+    def test_negative_data(self):
+        values = self.values.copy()
+        values[0] = -1.0
+        ros.ros_estimate(values, self.censored)
+
+
+class test_ros_grouped(object):
+    def setup(self):
+        data = testing.getTestROSData()
+        self.values = np.hstack([data.res.values, 2 * data.res.values[::-1]])
+        self.censored = np.hstack([(data.qual == 'ND').values,
+                                   (data.qual == 'ND').values[::-1]])
+        self.groups = np.repeat([1, 0], data.shape[0])
+
+    def test_against_ros_estimate(self):
+        final = ros.ros_grouped(self.values, self.censored, self.groups)
+        for g in [0, 1]:
+            mask = self.groups == g
+            known = ros.ros_estimate(self.values[mask], self.censored[mask])
+            nptest.assert_array_almost_equal(np.sort(final[mask]), np.sort(known))
+            nptest.assert_array_equal(final[mask & ~self.censored],
+                                      self.values[mask & ~self.censored])
+
+    @raises(ValueError)
+    def test_bad_shapes(self):
+        ros.ros_grouped(self.values, self.censored, self.groups[1:])
+
+
+class test_IncrementalMR(object):
+    def setup(self):
+        data = testing.getTestROSData()
+        self.values = data.res.values
+        self.censored = (data.qual == 'ND').values
+        self.mr = ros.IncrementalMR(self.values[:20], self.censored[:20])
+
+    def test_N(self):
+        assert_equal(self.mr.N_tot, 20)
+        assert_equal(self.mr.N_nd, self.censored[:20].sum())
+
+    def test_add(self):
+        self.mr.add(self.values[20:], self.censored[20:])
+        known = ros.ros_estimate(self.values, self.censored)
+        nptest.assert_array_almost_equal(np.sort(self.mr.data.final_data),
+                                         np.sort(known))
+        assert_list_equal(self.mr.data.columns.tolist(),
+                          ['final_data', 'res', 'qual'])
+
+    def test_remove(self):
+        self.mr.add(self.values[20:], self.censored[20:])
+        self.mr.remove(self.values[:5], self.censored[:5])
+        known = ros.ros_estimate(self.values[5:], self.censored[5:])
+        nptest.assert_array_almost_equal(np.sort(self.mr.data.final_data),
+                                         np.sort(known))
+
+    def test_lazy_refresh(self):
+        before = self.mr.data
+        assert_true(self.mr._estimates is not None)
+        self.mr.add(10.0, False)
+        assert_true(self.mr._estimates is None)
+        assert_equal(self.mr.data.shape[0], before.shape[0] + 1)
+
+    def test_default_censored(self):
+        mr = ros.IncrementalMR(self.values)
+        assert_equal(mr.N_nd, 0)
+        nptest.assert_array_equal(mr.data.final_data, np.sort(self.values))
+        assert_true(mr.fit is None)
+        assert_equal(mr.DLs.shape[0], 0)
+
+    def test_DLs_and_fit(self):
+        self.mr.add(self.values[20:], self.censored[20:])
+        self.mr.remove(self.values[:2], self.censored[:2])
+        data = pd.DataFrame({
+            'res': self.values[2:],
+            'qual': np.where(self.censored[2:], 'ND', '='),
+        })
+        known = ros.MR(data)
+        nptest.assert_array_almost_equal(self.mr.DLs.values, known.DLs.values)
+        assert_list_equal(self.mr.DLs.columns.tolist(), known.DLs.columns.tolist())
+        nptest.assert_array_almost_equal(self.mr.fit[:2], known.fit[:2])
+
+        # the table can't be changed from the outside
+        self.mr.DLs['PE'] = 0.0
+        nptest.assert_array_almost_equal(self.mr.DLs.values, known.DLs.values)
+
+    @raises(ValueError)
+    def test_remove_missing(self):
+        self.mr.remove([1234.5], [False])
+
+    @raises(ValueError)
+    def test_add_negative(self):
+        self.mr.add([-1.0], [False])
+
+
 class _baseMR_Mixin:
     @nottest
     def makePath(self, filename):
@@ -70,6 +228,14 @@ class _baseMR_Mixin:
                           ['res', 'qual', 'DLIndex', 'Norm Ranks', 'Avg Ranks',
                            'plot_pos', 'Zprelim', 'modeled_data', 'final_data'])
 
+    def test_debug_input_changed(self):
+        data = self.data.copy()
+        mr = ros.MR(data, ndsymbol=self.ndsymbol)
+        data['res'] *= 10
+        data['qual'] = self.ndsymbol
+        nptest.assert_array_equal(mr.debug.final_data, mr.data.final_data)
+        nptest.assert_array_equal(np.sort(mr.debug.res), np.sort(self.data.res))
+
     def test_N_tot(self):
         assert_true(hasattr(self.mr, 'N_tot'))
         assert_equal(self.mr.N_tot, self.data.shape[0])
@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 
 from nose.tools import *
 import numpy as np
@@ -26,6 +28,7 @@ from wqio.core.features import (
 )
 
 from wqio import utils
+from wqio import algo
 import warnings
 
 @nottest
@@ -162,6 +165,35 @@ class _base_LocationMixin(object):
         assert_true(hasattr(self.loc, 'bsIter'))
         assert_equal(self.loc.bsIter, self.known_bsIter)
 
+    def test__resample_plan(self):
+        assert_true(hasattr(self.loc, '_resample_plan'))
+        assert_tuple_equal(self.loc._resample_plan.shape,
+                           (self.known_bsIter, self.known_N))
+        assert_equal(self.loc._resample_plan.dtype, np.uint16)
+        assert_true(self.loc._resample_plan is self.loc._resample_plan)
+
+    def test__resample_plan_released(self):
+        # drawn once for all of the bootstrapped stats, then dropped
+        make_boot_index = algo.bootstrap.make_boot_index
+        draws = []
+
+        def counting_make_boot_index(*args, **kwargs):
+            draws.append(1)
+            return make_boot_index(*args, **kwargs)
+
+        try:
+            algo.bootstrap.make_boot_index = counting_make_boot_index
+            self.loc.median_conf_interval
+            self.loc._std_boostrap
+            assert_true('_resample_plan' in self.loc._cache)
+            self.loc.mean_conf_interval
+            self.loc.logmean_conf_interval
+        finally:
+            algo.bootstrap.make_boot_index = make_boot_index
+
+        assert_equal(len(draws), 1)
+        assert_false('_resample_plan' in self.loc._cache)
+
     def test_useROS(self):
         assert_true(hasattr(self.loc, 'useROS'))
         assert_equal(self.loc.useROS, self.known_useRos)
@@ -515,6 +547,51 @@ class test_Location_noROS(_base_LocationMixin):
                                    rtol=self.tolerance)
 
 
+def test_Location_bsSeed():
+    data = testing.getTestROSData()
+    loc1 = Location(data, bsIter=1500, bsSeed=42)
+    loc2 = Location(data, bsIter=1500, bsSeed=np.random.RandomState(42))
+    nptest.assert_array_equal(loc1._resample_plan, loc2._resample_plan)
+    nptest.assert_array_equal(loc1.median_conf_interval,
+                              loc2.median_conf_interval)
+    nptest.assert_array_equal(loc1.mean_conf_interval,
+                              loc2.mean_conf_interval)
+
+
+def test_Location_bootstrap_cache():
+    directory = tempfile.mkdtemp()
+    try:
+        algo.bootstrap.set_cache(directory)
+        data = testing.getTestROSData()
+        loc1 = Location(data, bsIter=1500, bsSeed=42)
+        known = loc1.median_conf_interval
+
+        loc2 = Location(data, bsIter=1500, bsSeed=42)
+        nptest.assert_array_equal(loc2.median_conf_interval, known)
+        assert_false('_resample_plan' in loc2._cache)
+    finally:
+        algo.bootstrap.set_cache(None)
+        shutil.rmtree(directory)
+
+
+def test_Location_bsCensored():
+    data = testing.getTestROSData()
+    loc = Location(data, bsIter=500, bsSeed=42, bsCensored=True)
+    values = data.res.values
+    censored = (data.qual == 'ND').values
+    known = algo.bootstrap.CensoredStat(values, censored, np.median,
+                                        NIter=500, seed=42).BCA()
+    nptest.assert_almost_equal(loc.median, known[0])
+    nptest.assert_array_almost_equal(loc.median_conf_interval, known[1])
+
+    loc.bsCensored = False
+    assert_false('_median_boostrap' in loc._cache)
+    nptest.assert_array_almost_equal(
+        loc.median_conf_interval,
+        algo.bootstrap.Stat(loc.data, np.median, NIter=500, seed=42).BCA()[1]
+    )
+
+
 @nottest
 def setup_location(station_type):
     data = testing.getTestROSData()
@@ -884,6 +961,55 @@ class test_Dataset(object):
     def test_medianCIsOverlap(self):
         assert_equal(self.known_medianCIsOverlap, self.ds.medianCIsOverlap)
 
+    def test_bootstrap_contrast_paired(self):
+        # the effluent is the influent minus 4.5 in every pair
+        res, CI = self.ds.bootstrap_contrast(paired=True)
+        nptest.assert_almost_equal(res, 4.5)
+        nptest.assert_array_almost_equal(CI, [4.5, 4.5])
+
+    def test_bootstrap_contrast_paired_ROS(self):
+        # paired and unpaired contrasts both use the ROS results, from
+        # each location's own result column
+        in_data = testing.getTestROSData().rename(columns={'res': 'conc'})
+        in_data['conc'] += 3
+        out_data = testing.getTestROSData().rename(columns={'res': 'conc'})
+        out_data['conc'] -= 1.5
+        influent = Location(in_data, station_type='inflow', bsIter=500,
+                            rescol='conc', qualcol='qual', useROS=True)
+        effluent = Location(out_data, station_type='outflow', bsIter=500,
+                            rescol='conc', qualcol='qual', useROS=True)
+        ds = Dataset(influent, effluent)
+        ds.bsSeed = 0
+
+        index = ds.paired_data.index
+        bs = algo.bootstrap.TwoSampleStat(influent.ros.data['final_data'].loc[index].values,
+                                          effluent.ros.data['final_data'].loc[index].values,
+                                          paired=True, NIter=500, seed=ds.contrast_seed)
+        known_res, known_CI = bs.BCA()
+        res, CI = ds.bootstrap_contrast(paired=True)
+        nptest.assert_almost_equal(res, known_res)
+        nptest.assert_array_almost_equal(CI, known_CI)
+
+    @raises(ValueError)
+    def test_geomean_ratio_nonpositive(self):
+        data = testing.getTestROSData()
+        data.loc[0, 'res'] = 0.0
+        influent = Location(data, station_type='inflow', bsIter=100,
+                            rescol='res', qualcol='qual', useROS=False)
+        Dataset(influent, self.effluent).geomean_ratio
+
+    def test_median_reduction(self):
+        res, CI = self.ds.median_reduction
+        assert_true(CI[0] <= 4.5 <= CI[1])
+
+    def test_percent_removal(self):
+        res, CI = self.ds.percent_removal
+        assert_true(0 < CI[0] <= CI[1] < 100)
+
+    def test_geomean_ratio(self):
+        res, CI = self.ds.geomean_ratio
+        assert_true(0 < CI[0] <= CI[1] < 1)
+
     def test__repr__normal(self):
         self.ds.__repr__
 
@@ -891,6 +1017,22 @@ class test_Dataset(object):
         self.ds.definition = None
         self.ds.__repr__
 
+    def test_bsSeed_None(self):
+        self.ds.bsSeed = 0
+        assert_true(self.ds.contrast_seed is not None)
+        self.ds.bsSeed = None
+        assert_true(self.ds.influent.bsSeed is None)
+        assert_true(self.ds.effluent.bsSeed is None)
+        assert_true(self.ds.contrast_seed is None)
+
+    def test_contrast_seed(self):
+        self.ds.bsSeed = 0
+        seed = self.ds.contrast_seed
+        self.ds.contrast_seed = 5
+        assert_equal(self.ds.contrast_seed, 5)
+        assert_true(self.ds.influent.bsSeed is not None)
+        assert_false(self.ds.contrast_seed is seed)
+
     def test_reset_useROS(self):
         #warnings.simplefilter("error")
         self.ds.useROS = True
@@ -1362,3 +1504,36 @@ class test_DataCollection_baseline(_base_DataCollecionMixin):
                 'D': 0.4790, 'E': 0.7710, 'F': 0.6370, 'G': 0.3070
             }
         })
+
+
+def test_DataCollection_bsSeed():
+    dc1 = DataCollection(make_dc_data(), paramcol='param', stationcol='loc',
+                         bsSeed=42)
+    dc2 = DataCollection(make_dc_data(), paramcol='param', stationcol='loc',
+                         bsSeed=42)
+    pdtest.assert_frame_equal(dc1.medians, dc2.medians)
+    nptest.assert_array_equal(dc1.locations[0]._resample_plan,
+                              dc2.locations[0]._resample_plan)
+
+
+def test_DataCollection_dataset_seeds():
+    data = make_dc_data().rename(index={'Inflow': 'inflow', 'Outflow': 'outflow'},
+                                 level='loc')
+    dc1 = DataCollection(data, paramcol='param', stationcol='loc', bsSeed=42,
+                         bsIter=500)
+    dc2 = DataCollection(data, paramcol='param', stationcol='loc', bsSeed=42,
+                         bsIter=500)
+    ds1, ds2 = dc1.datasets[0], dc2.datasets[0]
+    assert_true(ds1.influent is dc1.selectLocations(param='A', loc='inflow', squeeze=True))
+    assert_true(ds1.contrast_seed is dc1._seeds['datasets'][0])
+    nptest.assert_array_equal(ds1.bootstrap_contrast()[1],
+                              ds2.bootstrap_contrast()[1])
+
+
+def test_DataCollection_bsSeed_setter():
+    dc = DataCollection(make_dc_data(), paramcol='param', stationcol='loc',
+                        bsSeed=42)
+    plan = dc.locations[0]._resample_plan
+    dc.bsSeed = 7
+    assert_false('locations' in dc._cache)
+    assert_false(np.array_equal(dc.locations[0]._resample_plan, plan))